@@ -2,150 +2,304 @@
 # ---------------------------------------------------------------------------
 # Auswertung der Benchmark-CSVs – Gesamt-Ø  +  Ø getrennt nach User-Zahl
 # ---------------------------------------------------------------------------
+import os
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import re
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import matplotlib
+matplotlib.use("Agg")           # nicht-interaktives Backend – Plots werden nur gespeichert
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
+from PIL import Image             # kommt mit matplotlib – liest PNG-Metadaten
+
+from steady_cache import file_signature, write_csv
 
 # ───────────────────────────────── Einstellungen ────────────────────────────
 RES_DIR   = Path("results")     # Ordner mit den Ergebnis-CSV-Dateien
 PLOT_DIR  = Path("plots")       # Ordner für die Ausgabegrafiken
 PLOT_DIR.mkdir(exist_ok=True)  # Ordner erstellen, falls nicht vorhanden
 
+# Ausgewertete Messgrößen – je Gruppe werden Summe und Anzahl mitgeführt
+METRICS     = ["duration_ms", "server_ms", "avg_cpu", "avg_mem", "disk_mb"]
+GROUP_KEYS  = ["users", "variant", "concurrency", "query_no"]
+
+# Nur diese CSV-Spalten werden gelesen (statement/result etc. bleiben draußen).
+# Feste Typen, damit beim blockweisen Lesen jeder Block gleich interpretiert wird.
+RAW_TYPES   = {"db": pa.string(), "mode": pa.string(), "phase": pa.string(),
+               "concurrency": pa.int16(), "query_no": pa.int16(),
+               **{m: pa.float64() for m in METRICS}}
+BLOCK_BYTES = 8 << 20           # Blockgröße beim Streamen der CSVs (8 MiB)
+
 CONCURRENCY = [1, 3, 5, 10]     # Anzahl gleichzeitiger Nutzer in den Tests
 QUERY_IDS   = list(range(1, 25))# IDs der Abfragen (1–24)
 
 # Farbpalette für Liniengrafiken (z. B. für 4 Kurven pro Diagramm)
 COLOR_CMAP  = plt.get_cmap("Blues")
+LINE_COLORS = [COLOR_CMAP(0.35 + i * 0.15) for i in range(len(CONCURRENCY))]
+
+BAR_W       = 0.18              # Balkenbreite in den gruppierten Balkendiagrammen
+
+# Auflösung der PNG-Dateien: 200 dpi für die Auswertung,
+# 600 dpi nur für den finalen Druck-Export (HI_DPI=1)
+SAVE_DPI = 600 if os.environ.get("HI_DPI") == "1" else 200
+
+# Bildformat: PNG (Standard) oder WebP (PLOT_FORMAT=webp) – WebP-Dateien sind
+# etwa halb so groß, z. B. für Zwischenstände oder zum Teilen
+PLOT_FORMAT = "webp" if os.environ.get("PLOT_FORMAT", "").lower() == "webp" else "png"
+
+# Feste Ränder in Zoll (statt tight_layout + bbox_inches="tight", die jede
+# Figure beim Speichern zusätzlich neu layouten und vermessen)
+MARGINS_IN = {"left": 0.9, "right": 0.2, "top": 0.45, "bottom": 0.6}
 
-# Matplotlib-Standardwerte anpassen (z. B. für hohe Auflösung)
+# Matplotlib-Standardwerte anpassen
 plt.rcParams.update({
-    "figure.autolayout": True,  # automatischer Abstand von Elementen
-    "figure.dpi":        1000    # hohe Auflösung für Druck/Export
+    "figure.dpi":        100,   # Arbeitsauflösung der Figure
+    "savefig.dpi":       SAVE_DPI,
 })
 
-# ─────────────────────────────── Helper: Datacheck ───────────────────────────
-def _has_valid_values(arr_like) -> bool:
+# ────────────────────────────── Helper --------------------------------------
+def fix_margins(fig, bottom: float = MARGINS_IN["bottom"]) -> None:
     """
-    Liefert True, wenn das übergebene Array / Series
-    mindestens einen finite(n) Zahlenwert enthält.
+    Setzt die Ränder einer Figure auf feste Werte in Zoll – unabhängig von
+    ihrer Breite/Höhe, damit Achsenbeschriftungen nicht abgeschnitten werden.
     """
-    if isinstance(arr_like, pd.Series):
-        arr_like = arr_like.to_numpy()
-    return np.isfinite(arr_like).any()
+    w, h = fig.get_size_inches()
+    fig.subplots_adjust(
+        left   = MARGINS_IN["left"] / w,
+        right  = 1 - MARGINS_IN["right"] / w,
+        top    = 1 - MARGINS_IN["top"] / h,
+        bottom = bottom / h,
+    )
 
 
-# ────────────────────────────── Helper --------------------------------------
-def savefig(name: str):
+def plot_key(*parts) -> str:
     """
-    Speichert das aktuelle Diagramm als PNG-Datei im PLOT_DIR-Ordner.
+    Fingerabdruck eines Diagramms aus seinen Daten (Arrays/DataFrames) und
+    Beschriftungen – gleicher Schlüssel ⇒ gleiches Bild.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for part in (*parts, SAVE_DPI):
+        if isinstance(part, pd.DataFrame):
+            part = pd.util.hash_pandas_object(part, index=False).to_numpy()
+        h.update(part.tobytes() if isinstance(part, np.ndarray) else repr(part).encode())
+    return h.hexdigest()
+
+
+def plot_is_current(name: str, key: str) -> bool:
+    """
+    True, wenn plots/<name>.<PLOT_FORMAT> bereits mit demselben Schlüssel
+    gerendert wurde (steht in den Bild-Metadaten). FORCE_PLOTS=1 bzw. --force
+    erzwingt das Neuzeichnen, z. B. nach Änderungen am Layout.
+    """
+    path = PLOT_DIR / f"{name}.{PLOT_FORMAT}"
+    if os.environ.get("FORCE_PLOTS") == "1" or not path.exists():
+        return False
+    with Image.open(path) as img:
+        if PLOT_FORMAT == "png":
+            stored = img.text.get("PlotKey")
+        else:                                   # WebP: Schlüssel im XMP-Block
+            stored = img.info.get("xmp", b"").decode(errors="replace")
+    if stored != key:
+        return False
+    print(f"⏭️  plots/{path.name} unverändert")
+    return True
+
+
+def savefig(name: str, key: str | None = None):
+    """
+    Speichert das aktuelle Diagramm im PLOT_DIR-Ordner (PNG oder WebP).
     
     Parameter:
     - name (str): Dateiname (ohne Erweiterung)
+    - key (str): Schlüssel aus plot_key(), wird in den Bild-Metadaten abgelegt
     """
-    path = PLOT_DIR / f"{name}.png"
-    plt.savefig(path, dpi=600, bbox_inches="tight")
+    path = PLOT_DIR / f"{name}.{PLOT_FORMAT}"
+    if PLOT_FORMAT == "webp":
+        # Matplotlib kennt für WebP keine metadata= → Schlüssel als XMP
+        plt.savefig(path, pil_kwargs={"quality": 85, "method": 4,
+                                      "xmp": (key or "").encode()})
+    else:
+        plt.savefig(path, metadata={"PlotKey": key} if key else None)
     print(f"💾  plots/{path.name}")  # Hinweis in der Konsole
 
 
-def load_with_users(csv_path: Path) -> pd.DataFrame:
+def _means(totals: pd.DataFrame) -> pd.DataFrame:
     """
-    Liest eine Benchmark-CSV-Datei ein und extrahiert die Anzahl der Benutzer
-    aus dem Dateinamen (z. B. '10_results.csv' → users = 10).
-    
+    Bildet aus Summen/Anzahlen (Spalten: Metrik × {sum, count}) die Mittelwerte.
+    Fehlende Werte zählen wie bei .mean() nicht mit.
+    """
+    return totals.xs("sum", axis=1, level=1) / totals.xs("count", axis=1, level=1)
+
+
+# ─────────────────── Rohdaten streamen & verdichten (mit Cache) ──────────────
+def users_from_name(csv_path: Path) -> int:
+    """
+    Anzahl der Benutzer aus dem Dateinamen
+    (z. B. '1000_pg_opt_1_10_10_results.csv' → users = 1000).
+    """
+    stem = csv_path.name.split("_", 1)[0]
+    return int(stem) if stem.isdigit() else -1  # Fallback: -1, falls keine Zahl gefunden
+
+
+def _batch_totals(batch: pa.RecordBatch, users: int) -> pd.DataFrame:
+    """
+    Summen/Anzahlen eines Arrow-Blocks je (Variante, Concurrency, Query) in
+    einem Durchlauf: die drei Schlüssel werden zu einem int64-Code gepackt,
+    einmal faktorisiert und je Metrik mit np.bincount aufsummiert.
+    NaN-Werte zählen wie bei .mean() nicht mit.
+    """
+    # Kombination aus DB + Modus schon in Arrow bilden und als Dictionary kodieren
+    variant = pc.binary_join_element_wise(
+        batch["db"], batch["mode"], "_"
+    ).dictionary_encode()
+    key = (
+        (variant.indices.to_numpy().astype(np.int64) << 32)
+        | (batch["concurrency"].to_numpy().astype(np.int64) << 16)
+        | batch["query_no"].to_numpy().astype(np.int64)
+    )
+    codes, uniq = pd.factorize(key)
+    n = len(uniq)
+
+    cols = {}
+    for m in METRICS:
+        vals  = batch[m].to_numpy(zero_copy_only=False)
+        valid = ~np.isnan(vals)
+        cols[(m, "sum")]   = np.bincount(codes, weights=np.where(valid, vals, 0.0),
+                                         minlength=n)
+        cols[(m, "count")] = np.bincount(codes[valid], minlength=n)
+
+    index = pd.MultiIndex.from_arrays(
+        [
+            np.full(n, users, dtype=np.int32),
+            variant.dictionary.to_numpy(zero_copy_only=False)[uniq >> 32],
+            ((uniq >> 16) & 0xFFFF).astype(np.int16),
+            (uniq & 0xFFFF).astype(np.int16),
+        ],
+        names=GROUP_KEYS,
+    )
+    return pd.DataFrame(cols, index=index)
+
+
+def aggregate_csvs(csv_files: list[Path]) -> pd.DataFrame:
+    """
+    Liest alle Benchmark-CSVs in EINEM mehrfädigen PyArrow-Dataset-Scan und
+    verdichtet jeden Block sofort zu Summen/Anzahlen je (users, variant,
+    concurrency, query_no) – im Speicher liegen nie mehr als die gerade
+    gelesenen Blöcke plus die Gruppensummen.
+
     Parameter:
-    - csv_path (Path): Pfad zur CSV-Datei
-    
+    - csv_files (list[Path]): Pfade der Ergebnis-CSVs
+
     Rückgabe:
-    - pd.DataFrame: eingelesene Daten mit zusätzlicher 'users'-Spalte
+    - pd.DataFrame: Index GROUP_KEYS, Spalten Metrik × {sum, count}
     """
-    m = re.match(r"(\d+)_", csv_path.name)
-    users = int(m.group(1)) if m else -1  # Fallback: -1, falls keine Zahl gefunden
-    df = pd.read_csv(csv_path)
-    df["users"] = users
-    return df
-
-
-# ────────────────────────────── CSV einlesen --------------------------------
-csv_files = list(RES_DIR.glob("*_results.csv"))
-if not csv_files:
-    raise SystemExit("⚠️  Keine *_results.csv im Ordner 'results/' gefunden!")
-
-print("Gefundene Dateien:", ", ".join(f.name for f in csv_files))
-
-df_raw = (
-    pd.concat(load_with_users(f) for f in csv_files)
-      .query("phase == 'steady'")  # Entfernt Messdaten aus der Aufwärmphase
-      .assign(
-          variant=lambda d: d["db"] + "_" + d["mode"],  # Kombination aus DB + Modus
-          query_no=lambda d: d["query_no"].astype(int)  # Query-Nr. als int (für Sortierung)
-      )
-      .reset_index(drop=True)
-)
-
-
-# ────────────── Pivot-Tabelle (Ø über repeats / rounds / users) ──────────────
-pivot_all = (
-    df_raw.groupby(["variant", "concurrency", "query_no"])
-          .agg(duration_ms=("duration_ms", "mean"),   # Durchschnittliche Dauer pro Query
-               server_ms  =("server_ms",  "mean"),
-               avg_cpu     =("avg_cpu",      "mean"),   # Durchschnittliche CPU-Auslastung
-               avg_mem     =("avg_mem",      "mean"))   # Durchschnittlicher Speicherverbrauch
-          .reset_index()
-)
+    users_of = {f.name: users_from_name(f) for f in csv_files}
+    dataset  = ds.dataset(
+        [str(f) for f in csv_files],
+        format=ds.CsvFileFormat(
+            read_options=pacsv.ReadOptions(block_size=BLOCK_BYTES),
+            convert_options=pacsv.ConvertOptions(column_types=RAW_TYPES),
+        ),
+    )
+    # Spaltenauswahl und Steady-Filter werden schon beim Scan angewendet
+    scanner = dataset.scanner(
+        columns=[c for c in RAW_TYPES if c != "phase"],
+        filter=ds.field("phase") == "steady",
+    )
 
+    parts = [
+        _batch_totals(tagged.record_batch,
+                      users_of[Path(tagged.fragment.path).name])
+        for tagged in scanner.scan_batches()
+        if tagged.record_batch.num_rows
+    ]
 
-# ────────────── Pivot pro User-Größe  (100, 1000 …)  ─────────────────────────
-pivot_by_user = (
-    df_raw.groupby(["users", "variant", "concurrency", "query_no"])
-          .agg(duration_ms=("duration_ms", "mean"),   # Ø pro Benutzergruppe
-               server_ms  =("server_ms",  "mean"),
-               avg_cpu     =("avg_cpu",      "mean"),
-               avg_mem     =("avg_mem",      "mean"))
-          .reset_index()
-)
+    # Teilsummen aller Blöcke zusammenführen (Summen & Anzahlen addieren)
+    return pd.concat(parts).groupby(level=GROUP_KEYS, observed=True).sum()
+
+
+def load_totals(csv_files: list[Path]) -> pd.DataFrame:
+    """
+    Liefert die Summen/Anzahlen aus dem Parquet-Cache, solange sich die
+    Menge der CSVs (Name, Änderungszeit, Größe) nicht geändert hat – sonst
+    wird neu eingelesen und ein neuer Cache geschrieben. Auch hinzugefügte
+    oder gelöschte Dateien führen so zu einem neuen Schlüssel.
+    """
+    cache = RES_DIR / f"_totals_{file_signature(csv_files)}.parquet"
+    if cache.exists():
+        print(f"📦 Summen aus Cache: {cache}")
+        return pd.read_parquet(cache, engine="pyarrow")
+
+    totals = aggregate_csvs(csv_files)
+    for old in RES_DIR.glob("_totals_*.parquet"):   # veraltete Caches entfernen
+        old.unlink()
+    totals.to_parquet(cache, engine="pyarrow", compression="zstd")
+    return totals
 
 
 # ─────────────────────────── Zeichen-Funktionen ─────────────────────────────
-def line_plots(source: pd.DataFrame, tag: str):
+def _dense_cube(source: pd.DataFrame, metrics: list, variants: list) -> np.ndarray:
+    """
+    Überträgt die Metriken in ein dichtes Array der Form
+    (Metrik, Variante, Concurrency, Query-ID) – ein einziger Scatter statt
+    Maske + set_index + reindex je Linie. Fehlende Kombinationen bleiben NaN.
+    """
+    v_idx = pd.Categorical(source["variant"], categories=variants).codes
+    c_idx = pd.Index(CONCURRENCY).get_indexer(source["concurrency"])
+    q_idx = pd.Index(QUERY_IDS).get_indexer(source["query_no"])
+    keep  = (v_idx >= 0) & (c_idx >= 0) & (q_idx >= 0)
+
+    cube = np.full(
+        (len(metrics), len(variants), len(CONCURRENCY), len(QUERY_IDS)), np.nan
+    )
+    cube[:, v_idx[keep], c_idx[keep], q_idx[keep]] = source[metrics].to_numpy()[keep].T
+    return cube
+
+
+def line_plots(source: pd.DataFrame, tag: str, variants: list):
     metrics = [
         ("duration_ms", "Average Duration (ms)", "A_duration"),
         ("server_ms",   "Server Execution (ms)", "B_server"),
         ("avg_cpu",     "Average CPU (%)",       "C_cpu"),
         ("avg_mem",     "Average RAM (MB)",      "D_ram"),
     ]
+    query_x  = np.asarray(QUERY_IDS)
 
-    for metric, ylabel, prefix in metrics:
-        for variant, g_var in source.groupby("variant"):
-            fig, ax = plt.subplots(figsize=(10, 4))
-            plotted = False
-
-            for i, conc in enumerate(CONCURRENCY):
-                g = (
-                    g_var[g_var["concurrency"] == conc]
-                      .set_index("query_no")
-                      .reindex(QUERY_IDS)[metric]
-                )
-                if not _has_valid_values(g.to_numpy()):
-                    continue  # keine Werte → nächste Linie
-
-                valid_x = g.index[~g.isna()]
-                ax.plot(
-                    valid_x,
-                    g.loc[valid_x],
-                    marker="o",
-                    color=COLOR_CMAP(0.35 + i * 0.15),
-                    label=f"{conc} Threads",
-                )
-                plotted = True
-
-            if not plotted:  # keine einzige Linie gezeichnet → Plot verwerfen
-                plt.close(fig)
+    # Eine Figure für alle Plots dieser Funktion – zwischen den Plots nur leeren
+    fig, ax = plt.subplots(figsize=(10, 4))
+    fix_margins(fig)
+
+    # alle Metriken in einem Durchlauf über die Quelle einsortieren
+    cubes = _dense_cube(source, [m for m, _, _ in metrics], variants)
+
+    for cube, (metric, ylabel, prefix) in zip(cubes, metrics):
+        for vi, variant in enumerate(variants):
+            plot_name = f"{prefix}{tag}_{variant}"
+            key       = plot_key(cube[vi], metric, ylabel, variant)
+            if plot_is_current(plot_name, key):
+                continue
+
+            ax.cla()
+
+            # nur Concurrency-Stufen mit Werten; Lücken (NaN) bleiben Lücken
+            rows = np.flatnonzero(np.isfinite(cube[vi]).any(axis=1))
+            if rows.size == 0:  # keine einzige Linie → Plot verwerfen
                 print(f"⚠️  {metric}/{variant} – zu wenig Daten, Plot übersprungen")
                 continue
 
+            # alle Linien mit einem Aufruf: Spalten von Y.T = Concurrency-Stufen
+            lines = ax.plot(query_x, cube[vi, rows].T, marker="o")
+            for line, i in zip(lines, rows):
+                line.set_color(LINE_COLORS[i])
+                line.set_label(f"{CONCURRENCY[i]} Threads")
+
             ax.set_title(f"{variant} – {ylabel} je Query")
             ax.set_xlabel("Query-ID")
             ax.set_ylabel(ylabel)
@@ -154,32 +308,38 @@ def line_plots(source: pd.DataFrame, tag: str):
             ax.yaxis.grid(True, linestyle=":", alpha=.6)
             ax.legend(title="Concurrency")
 
-            savefig(f"{prefix}{tag}_{variant}")
-            plt.close(fig)
+            savefig(plot_name, key)
 
+    plt.close(fig)
 
-def grouped_bars(source: pd.DataFrame, tag: str) -> None:
+
+def grouped_bars(source: pd.DataFrame, tag: str, variants: list) -> None:
     """
     Gruppierte Balkendiagramme (je Concurrency ein Plot)
     """
-    bar_w    = 0.18
+    cube     = _dense_cube(source, ["duration_ms"], variants)[0]
+
+    # x-Positionen aller Balken (Variante × Query) – einmal für alle Plots
     x_pos    = np.arange(len(QUERY_IDS))
-    variants = sorted(source["variant"].unique())
-
-    for conc in CONCURRENCY:
-        # ---------- Datenmatrix bauen -----------------------------------
-        y = {}
-        for v in variants:
-            mask = (source["concurrency"] == conc) & (source["variant"] == v)
-            y[v] = (source.loc[mask]
-                          .set_index("query_no")
-                          .reindex(QUERY_IDS)["duration_ms"]
-                          .to_numpy())
-        y_all = np.concatenate(list(y.values()))
-        if not _has_valid_values(y_all):
+    offsets  = (np.arange(len(variants)) - (len(variants) - 1) / 2) * BAR_W
+    bar_x    = x_pos + offsets[:, None]
+
+    # Eine Figure für alle Concurrency-Stufen; Höhe wird je Plot angepasst
+    fig, ax = plt.subplots(figsize=(12, 4))
+
+    for ci, conc in enumerate(CONCURRENCY):
+        # ---------- Datenmatrix (Variante × Query) ----------------------
+        y_all    = cube[:, ci, :]
+        has_data = np.isfinite(y_all).any(axis=1)     # je Variante
+        if not has_data.any():
             print(f"⚠️  Concurrency {conc} – keine Daten, Plot übersprungen")
             continue
 
+        plot_name = f"D_conc{conc}{tag}_duration_grouped"
+        key       = plot_key(y_all, variants, conc)
+        if plot_is_current(plot_name, key):
+            continue
+
         global_min = np.nanmin(y_all)
         global_max = np.nanmax(y_all)
         ratio      = global_max / max(global_min, 1e-9)
@@ -195,23 +355,24 @@ def grouped_bars(source: pd.DataFrame, tag: str) -> None:
         else:
             yscale = ("linear", {})
 
-        fig, ax = plt.subplots(figsize=(12, fig_h))
+        ax.cla()
+        fig.set_size_inches(12, fig_h)
+        fix_margins(fig)
 
         # ---------- Balken zeichnen -------------------------------------
-        offset = -(len(variants) - 1) / 2 * bar_w
         for j, v in enumerate(variants):
-            if not _has_valid_values(y[v]):       # Variante komplett leer → skip
+            if not has_data[j]:                   # Variante komplett leer → skip
                 continue
             ax.bar(
-                x_pos + offset + j * bar_w,
-                y[v],
-                width=bar_w,
+                bar_x[j],
+                y_all[j],
+                width=BAR_W,
                 label=v,
+                rasterized=True,    # bei Vektor-Export: Balken als ein Pixelbild
             )
 
         # ---------- Speichern oder verwerfen ----------------------------
         if not ax.patches:                        # gar kein Balken → nichts speichern
-            plt.close(fig)
             print(f"⚠️  Concurrency {conc} – alle Varianten leer, Plot übersprungen")
             continue
 
@@ -225,59 +386,68 @@ def grouped_bars(source: pd.DataFrame, tag: str) -> None:
         ax.yaxis.grid(True, linestyle=":", alpha=.6, which="both")
         ax.legend(title="Variante", fontsize=8)
 
-        savefig(f"D_conc{conc}{tag}_duration_grouped")
-        plt.close(fig)
+        savefig(plot_name, key)
+
+    plt.close(fig)
 
 
 
 # ─────────────────────────  BARS PLOT  ────────────────────────────────────
-def bars_conc_variant(df: pd.DataFrame, *, all_users: bool = False) -> None:
+def bars_conc_variant(df: pd.DataFrame, variants: list, *, all_users: bool = False) -> None:
     """
     Balkendiagramm(e) Ø-Duration_ms  vs.  Concurrency  &  Variante
     """
     # Mittelwert über alle Query-IDs bilden
     base = (
-        df.groupby(["users", "concurrency", "variant"], as_index=False)["duration_ms"]
+        df.groupby(["users", "concurrency", "variant"],
+                   observed=True, sort=False, as_index=False)["duration_ms"]
           .mean()
     )
 
-    # komplette Variant-Palette (für konsistente Farben)
-    var_palette = sorted(base["variant"].unique())
+    # komplette Variant-Palette (für konsistente Farben über alle Plots)
+    var_palette = variants
     cmap        = plt.get_cmap("tab10")
     palette     = {v: cmap(i) for i, v in enumerate(var_palette)}
-    bar_w       = 0.18
     x_pos       = np.arange(len(CONCURRENCY))
+    offsets     = (np.arange(len(var_palette)) - (len(var_palette) - 1) / 2) * BAR_W
+    bar_x       = x_pos + offsets[:, None]      # (Variante × Concurrency)
+
+    # Eine Figure für alle Plots dieser Funktion – zwischen den Plots nur leeren
+    fig, ax = plt.subplots(figsize=(8, 4))
+    fix_margins(fig)
 
     # ───────────────────────── Helper: EIN Balkendiagramm ───────────────────
-    def _draw(ax, g, title_suffix: str, filename_suffix: str) -> None:
-        offset = -(len(var_palette) - 1) / 2 * bar_w
+    def _draw(g, title_suffix: str, filename_suffix: str) -> None:
+        plot_name = f"E_users{filename_suffix}_conc_vs_variant"
+        key       = plot_key(g, var_palette, title_suffix)
+        if plot_is_current(plot_name, key):
+            return
+
+        # Matrix (Variante × Concurrency) – ein Pivot statt Maske je Variante
+        mat = (
+            g.pivot(index="variant", columns="concurrency", values="duration_ms")
+             .reindex(index=var_palette, columns=CONCURRENCY)
+             .to_numpy()
+        )
+        has_data = np.isfinite(mat).any(axis=1)
+
+        ax.cla()
         for j, v in enumerate(var_palette):
-            ys = (
-                g[g["variant"] == v]
-                  .set_index("concurrency")
-                  .reindex(CONCURRENCY)["duration_ms"]
-                  .to_numpy()
-            )
-            if not _has_valid_values(ys):
+            ys = mat[j]
+            if not has_data[j]:
                 continue                     # nichts für diese Variante
-            ax.bar(
-                x_pos + offset + j * bar_w,
+            bars = ax.bar(
+                bar_x[j],
                 ys,
-                width=bar_w,
+                width=BAR_W,
                 color=palette[v],
                 label=v,
             )
-            # Balkenbeschriftung
-            for xp, val in zip(x_pos + offset + j * bar_w, ys):
-                ax.text(
-                    xp, val, f"{val:.0f}",
-                    ha="center", va="bottom",
-                    fontsize=6, rotation=90,
-                )
+            # Balkenbeschriftung (NaN-Balken bleiben ohne Text)
+            ax.bar_label(bars, fmt="{:.0f}", padding=0, fontsize=6, rotation=90)
 
         # Wurde überhaupt etwas gezeichnet?
         if not ax.patches:
-            plt.close(ax.figure)
             print(f"⚠️  {title_suffix}: keine Daten, Plot übersprungen")
             return
 
@@ -288,30 +458,29 @@ def bars_conc_variant(df: pd.DataFrame, *, all_users: bool = False) -> None:
         ax.yaxis.grid(True, linestyle=":", alpha=.6)
         ax.legend(title="Variante", fontsize=8)
 
-        savefig(f"E_users{filename_suffix}_conc_vs_variant")
-        plt.close(ax.figure)
+        savefig(plot_name, key)
 
     # ───────────────────────── alle User zusammen ───────────────────────────
     if all_users:
         g_all = (
-            base.groupby(["concurrency", "variant"], as_index=False)["duration_ms"]
+            base.groupby(["concurrency", "variant"],
+                         observed=True, sort=False, as_index=False)["duration_ms"]
                 .mean()
         )
-        fig, ax = plt.subplots(figsize=(8, 4))
-        _draw(ax, g_all.assign(users="ALL"), "ALL Users", "ALL")
-        return
+        _draw(g_all.assign(users="ALL"), "ALL Users", "ALL")
+    else:
+        # ─────────────────────── getrennt nach User-Größe ───────────────────
+        for users, g in base.groupby("users", observed=True, sort=False):
+            _draw(g, f"{users} Users", str(users))
 
-    # ───────────────────────── getrennt nach User-Größe ─────────────────────
-    for users, g in base.groupby("users"):
-        fig, ax = plt.subplots(figsize=(8, 4))
-        _draw(ax, g, f"{users} Users", str(users))
+    plt.close(fig)
 
 
 
 def bars_variant_users(df: pd.DataFrame) -> None:
     # Ø-Volumen pro Variante & User-Gruppe
     base = (
-        df.groupby(["variant", "users"], observed=True)["volume_mb"]
+        df.groupby(["variant", "users"], observed=True, sort=False)["volume_mb"]
           .mean()
           .reset_index()
     )
@@ -320,36 +489,40 @@ def bars_variant_users(df: pd.DataFrame) -> None:
     user_order = sorted(base["users"].unique())
     bar_w      = 0.8 / len(user_order)               # Clusterbreite
     x_pos      = np.arange(len(var_order))
-    offset0    = -(len(user_order) - 1) / 2 * bar_w
+    offsets    = (np.arange(len(user_order)) - (len(user_order) - 1) / 2) * bar_w
+    bar_x      = x_pos + offsets[:, None]            # (User-Gruppe × Variante)
+
+    plot_name = "F_variant_vs_users_volume"
+    key       = plot_key(base)
+    if plot_is_current(plot_name, key):
+        return
 
     fig, ax = plt.subplots(figsize=(8, 4))
+    fix_margins(fig, bottom=0.8)          # Platz für die gedrehten Variantennamen
     cmap    = plt.get_cmap("tab10")
 
+    # Matrix (User-Gruppe × Variante) – ein Pivot statt Maske je Gruppe
+    mat = (
+        base.pivot(index="users", columns="variant", values="volume_mb")
+            .reindex(index=user_order, columns=var_order)
+            .to_numpy()
+    )
+    has_data = np.isfinite(mat).any(axis=1)
+
     for j, users in enumerate(user_order):
-        ys = (
-            base[base["users"] == users]
-                .set_index("variant")
-                .reindex(var_order)["volume_mb"]
-                .to_numpy()
-        )
-        if not _has_valid_values(ys):                # komplette User-Gruppe leer?
+        ys = mat[j]
+        if not has_data[j]:                          # komplette User-Gruppe leer?
             continue
 
-        ax.bar(
-            x_pos + offset0 + j * bar_w,
+        bars = ax.bar(
+            bar_x[j],
             ys,
             width=bar_w,
             color=cmap(j),
             label=f"{users:,} Users",
         )
-        # optionale Balkenbeschriftung
-        for xp, val in zip(x_pos + offset0 + j * bar_w, ys):
-            if np.isfinite(val):
-                ax.text(
-                    xp, val, f"{val:.1f}",
-                    ha="center", va="bottom",
-                    fontsize=6, rotation=90,
-                )
+        # optionale Balkenbeschriftung (NaN-Balken bleiben ohne Text)
+        ax.bar_label(bars, fmt="{:.1f}", padding=0, fontsize=6, rotation=90)
 
     # Wurde überhaupt etwas gezeichnet?
     if not ax.patches:
@@ -364,13 +537,13 @@ def bars_variant_users(df: pd.DataFrame) -> None:
     ax.set_title("Datenbank-Volume – Variante vs. User-Größe")
     ax.legend(title="User-Gruppe", fontsize=8)
 
-    savefig("F_variant_vs_users_volume")
+    savefig(plot_name, key)
     plt.close(fig)
 
 
 # ─────────────────────────  SUMMARY → CSV  ────────────────────────────
 def export_summary_csv(
-    df: pd.DataFrame,
+    totals: pd.DataFrame,
     out_dir: Path = Path("results"),
     decimals: int = 1,
 ) -> None:
@@ -380,6 +553,9 @@ def export_summary_csv(
     • per_complexity_table.csv – Ø je Komplexitätsgruppe
                                   (Easy, Medium, …, Delete)
     Reihenfolge der Metriken: Duration → ServerTime → CPU → RAM → Disk
+
+    Grundlage sind die Summen/Anzahlen je (users, variant, concurrency,
+    query_no) aus load_totals().
     """
     out_dir.mkdir(exist_ok=True)
 
@@ -388,45 +564,53 @@ def export_summary_csv(
     VARIANT_ORDER = ["postgres_normal", "postgres_optimized",
                      "neo4j_normal",   "neo4j_optimized"]
 
-    df = df.copy()
-    df["variant"] = pd.Categorical(df["variant"],
-                                   categories=VARIANT_ORDER,
-                                   ordered=True)
-
     # ────────────────────────────────────────────────────────────────────────
-    # 0️⃣  Hilfsspalte »complexity« aus query_no ableiten
+    # 0️⃣  Komplexitätsgruppe aus query_no ableiten
     # ----------------------------------------------------------------------
-    def _complexity(q):
-        if   1  <= q <=  3:  return "easy"
-        elif 4  <= q <=  6:  return "medium"
-        elif 7  <= q <=  9:  return "complex"
-        elif 10 <= q <= 12:  return "very_complex"
-        elif 13 <= q <= 16:  return "create"
-        elif 17 <= q <= 20:  return "update"
-        else:                return "delete"        # 21–24
-    df["complexity"] = df["query_no"].astype(int).map(_complexity)
-
     COMPLEXITY_ORDER = ["easy", "medium", "complex",
                         "very_complex", "create", "update", "delete"]
-    df["complexity"] = pd.Categorical(df["complexity"],
-                                      categories=COMPLEXITY_ORDER,
-                                      ordered=True)
+    # letzte Query-ID je Gruppe: 1–3 easy, 4–6 medium, … , 21–24 delete
+    COMPLEXITY_LAST  = np.array([3, 6, 9, 12, 16, 20, 24])
+
+    # ────────────────────────────────────────────────────────────────────────
+    # Summen & Anzahlen je (users, concurrency, variant, query_no) mit fester
+    # Variantenreihenfolge; alle drei Tabellen werden daraus abgeleitet
+    # ----------------------------------------------------------------------
+    idx  = totals.index
+    leaf = (
+        totals[METRIC_ORDER]
+          .groupby([idx.get_level_values("users"),
+                    idx.get_level_values("concurrency"),
+                    pd.Categorical(idx.get_level_values("variant"),
+                                   categories=VARIANT_ORDER,
+                                   ordered=True),
+                    idx.get_level_values("query_no")], observed=True).sum()
+          .rename_axis(["users", "concurrency", "variant", "query_no"])
+    )
+    # Komplexitätsgruppe je Zeile per Binärsuche statt Python-Callback
+    codes = np.searchsorted(COMPLEXITY_LAST, leaf.index.get_level_values("query_no"))
+    complexity = pd.Categorical.from_codes(
+        np.minimum(codes, len(COMPLEXITY_ORDER) - 1),   # > 24 → delete
+        categories=COMPLEXITY_ORDER,
+        ordered=True,
+    )
+
+    def wide(means: pd.DataFrame) -> pd.DataFrame:
+        """Lange Ø-Tabelle → eine Spalte je Metrik × Variante (metric_variant)."""
+        table = (means.round(decimals)
+                      .dropna(how="all")
+                      .unstack("variant")
+                      .dropna(how="all", axis=1))
+        table.columns = [f"{m}_{v}" for m, v in table.columns.to_flat_index()]
+        return table.reset_index()
 
     # ────────────────────────────────────────────────────────────────────────
     # 1️⃣  SUMMARY  (Ø über alle Queries & Wiederholungen)
     # ----------------------------------------------------------------------
-    summary = (
-        df.groupby(["users", "concurrency", "variant"], observed=True)
-          .agg({m: "mean" for m in METRIC_ORDER})
-          .round(decimals)
-          .pivot_table(index   = ["users", "concurrency"],
-                       columns = "variant",
-                       values  = METRIC_ORDER,
-                       sort=False,
-                       observed=True)
+    summary = wide(
+        leaf.groupby(level=["users", "concurrency", "variant"], observed=True).sum()
+            .pipe(_means)
     )
-    summary.columns = [f"{m}_{v}" for m, v in summary.columns.to_flat_index()]
-    summary = summary.reset_index()
 
     # Gesamtzeile 'ALL'
     overall = (summary.drop(columns=["users", "concurrency"])
@@ -435,61 +619,116 @@ def export_summary_csv(
     overall.insert(0, "users", "ALL")
     summary = pd.concat([summary, overall], ignore_index=True)
 
-    summary.to_csv(out_dir / "summary_table.csv", index=False)
-    print(f"💾 summary_table.csv geschrieben → {out_dir}")
-
     # ────────────────────────────────────────────────────────────────────────
     # 2️⃣  PER-QUERY-TABELLE  (Ausreißer)
     # ----------------------------------------------------------------------
-    per_q = (
-        df.groupby(["users", "concurrency", "variant", "query_no"], observed=True)
-          .agg({m: "mean" for m in METRIC_ORDER})
-          .round(decimals)
-          .pivot_table(index   = ["users", "concurrency", "query_no"],
-                       columns = "variant",
-                       values  = METRIC_ORDER,
-                       sort=False,
-                       observed=True)
-    )
-    per_q.columns = [f"{m}_{v}" for m, v in per_q.columns.to_flat_index()]
-    per_q = per_q.reset_index()
-    per_q.to_csv(out_dir / "per_query_table.csv", index=False)
-    print(f"💾 per_query_table.csv geschrieben → {out_dir}")
+    per_q = wide(_means(leaf))
 
     # ────────────────────────────────────────────────────────────────────────
     # 3️⃣  PER-COMPLEXITY-TABELLE  (Easy … Delete)
     # ----------------------------------------------------------------------
-    per_c = (
-        df.groupby(["users", "concurrency", "variant", "complexity"], observed=True)
-          .agg({m: "mean" for m in METRIC_ORDER})
-          .round(decimals)
-          .pivot_table(index   = ["users", "concurrency", "complexity"],
-                       columns = "variant",
-                       values  = METRIC_ORDER,
-                       sort=False,
-                       observed=True)
+    per_c = wide(
+        leaf.groupby([leaf.index.get_level_values("users"),
+                      leaf.index.get_level_values("concurrency"),
+                      leaf.index.get_level_values("variant"),
+                      complexity], observed=True).sum()
+            .rename_axis(["users", "concurrency", "variant", "complexity"])
+            .pipe(_means)
     )
-    per_c.columns = [f"{m}_{v}" for m, v in per_c.columns.to_flat_index()]
-    per_c = per_c.reset_index()
-    per_c.to_csv(out_dir / "per_complexity_table.csv", index=False)
-    print(f"💾 per_complexity_table.csv geschrieben → {out_dir}")
-
-# ───────────────────── Gesamtdurchschnitt (alle Users) ───────────────────────
-print("\n▶  Plots für ALLE Runs zusammen")
-line_plots(pivot_all, tag="_all")
-grouped_bars(pivot_all, tag="_all")
-bars_conc_variant(df_raw, all_users=True)
-vol_df = pd.read_csv("results/volume_sizes.csv")
-bars_variant_users(vol_df)
-
-# ───────────────────── Plots pro User-Größe (z. B. 100 / 1000 / 10000) ───────
-for users, g_user in pivot_by_user.groupby("users"):
-    print(f"\n▶  Plots für User-Größe {users}")
-    suffix = f"_u{users}"
-    line_plots(g_user, tag=suffix)
-    grouped_bars(g_user, tag=suffix)
-    bars_conc_variant(g_user)
-
-export_summary_csv(df_raw)   # schreibt results/summary_table.csv
-
-print("\n✅  Fertig!  Alle Diagramme liegen jetzt im Ordner  plots/")
+
+    for table, fname in ((summary, "summary_table.csv"),
+                         (per_q,   "per_query_table.csv"),
+                         (per_c,   "per_complexity_table.csv")):
+        write_csv(table, out_dir / fname)
+        print(f"💾 {fname} geschrieben → {out_dir}")
+
+# ═════════════════════════════ Hauptprogramm ════════════════════════════════
+def load_and_aggregate() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Liest (bzw. lädt aus dem Cache) alle Ergebnis-CSVs und leitet die
+    Mittelwert-Tabellen ab – ohne Plots zu zeichnen, z. B. für ein Notebook.
+
+    Rückgabe:
+    - totals: Summen/Anzahlen je (users, variant, concurrency, query_no)
+    - pivot_all: Ø je (variant, concurrency, query_no) über alle User-Größen
+    - pivot_by_user: Ø je (users, variant, concurrency, query_no)
+    """
+    csv_files = list(RES_DIR.glob("*_results.csv"))
+    if not csv_files:
+        raise SystemExit("⚠️  Keine *_results.csv im Ordner 'results/' gefunden!")
+
+    print("Gefundene Dateien:", ", ".join(f.name for f in csv_files))
+
+    # Summen & Anzahlen je (User, Variante, Concurrency, Query) – die Rohzeilen
+    # werden nur blockweise gestreamt; gröbere Tabellen werden daraus abgeleitet
+    totals = load_totals(csv_files)
+
+    # ────────────── Pivot pro User-Größe  (100, 1000 …)  ─────────────────────────
+    pivot_by_user = _means(totals).reset_index()   # Ø pro Benutzergruppe
+
+    # ────────────── Pivot-Tabelle (Ø über repeats / rounds / users) ──────────────
+    # gewichteter Mittelwert: Summen und Anzahlen über alle User-Größen addieren
+    pivot_all = _means(
+        totals.groupby(level=["variant", "concurrency", "query_no"], observed=True).sum()
+    ).reset_index()
+
+    return totals, pivot_all, pivot_by_user
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--force", action="store_true",
+                    help="alle Plots neu zeichnen, auch wenn sich die Daten nicht geändert haben")
+    if ap.parse_args().force:
+        os.environ["FORCE_PLOTS"] = "1"    # wird an die Worker-Prozesse vererbt
+
+    totals, pivot_all, pivot_by_user = load_and_aggregate()
+
+    # Variantenliste einmal bestimmen – gleiche Reihenfolge & Farben in allen Plots
+    variants = sorted(totals.index.unique("variant"))
+
+    # ────────────── Ø-Duration je (User, Concurrency, Variante) ──────────────────
+    user_means = _means(
+        totals.groupby(level=["users", "concurrency", "variant"], observed=True).sum()
+    )[["duration_ms"]].reset_index()
+
+    # ───────────────────── Plots parallel rendern ──────────────────────────
+    # Jede Grafik ist unabhängig → ein Task je Zeichenfunktion und Datenquelle.
+    # An die Worker gehen nur die bereits aggregierten Tabellen, damit das
+    # Pickling billig bleibt.
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        # ───────────── Gesamtdurchschnitt (alle Users) ─────────────
+        print("\n▶  Plots für ALLE Runs zusammen")
+        jobs = [
+            pool.submit(line_plots, pivot_all, "_all", variants),
+            pool.submit(grouped_bars, pivot_all, "_all", variants),
+            pool.submit(bars_conc_variant, user_means, variants, all_users=True),
+        ]
+        # Volumen-Messung ist optional – ohne Datei entfällt nur dieser Plot
+        try:
+            vol_df = pacsv.read_csv(RES_DIR / "volume_sizes.csv").to_pandas()
+            jobs.append(pool.submit(bars_variant_users, vol_df))
+        except FileNotFoundError:
+            print("⚠️  volume_sizes.csv fehlt – Volumen-Plot übersprungen")
+
+        # ───────────── Plots pro User-Größe (z. B. 100 / 1000 / 10000) ─────
+        for users, g_user in pivot_by_user.groupby("users", observed=True):
+            print(f"\n▶  Plots für User-Größe {users}")
+            suffix = f"_u{users}"
+            jobs += [
+                pool.submit(line_plots, g_user, suffix, variants),
+                pool.submit(grouped_bars, g_user, suffix, variants),
+                pool.submit(bars_conc_variant, g_user, variants),
+            ]
+
+        # Tabellen schreibt der Hauptprozess, während die Worker zeichnen
+        export_summary_csv(totals)   # schreibt results/summary_table.csv
+
+        for job in jobs:
+            job.result()    # Fehler aus den Workern hier sichtbar machen
+
+    print("\n✅  Fertig!  Alle Diagramme liegen jetzt im Ordner  plots/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,15 @@
 # compute_significance.py
 
-import re
 from pathlib import Path
-import itertools
 
 import numpy as np
 import pandas as pd
-from scipy import stats
+import pyarrow.dataset as ds
+from scipy import special, stats
+
+from steady_cache import COMPLEXITY_BINS, COMPLEXITY_ORDER, RES_DIR, load_steady, write_csv
 
 # ─── Einstellungen ─────────────────────────────────────────────────────────
-RES_DIR       = Path("results")
 PATTERN       = "*_results.csv"
 ALPHA         = 0.05  # 95 % Konfidenz
 
@@ -25,114 +25,146 @@ OUT_P99_Q     = RES_DIR / "p99_by_query.csv"
 OUT_SIG_Q     = RES_DIR / "significance_by_query.csv"
 OUT_P50_Q    = RES_DIR / "p50_by_query.csv"
 
-# Komplexitäts-Mapping
-COMPLEX_MAP = {
-    range(1,  4):   "easy",
-    range(4,  7):   "medium",
-    range(7, 10):   "complex",
-    range(10,13):   "very_complex",
-    range(13,17):   "create",
-    range(17,21):   "update",
-    range(21,25):   "delete",
-}
-COMPLEXITY_ORDER = ["easy","medium","complex","very_complex","create","update","delete"]
-
-def map_complexity(q):
-    q = int(q)
-    for r,label in COMPLEX_MAP.items():
-        if q in r:
-            return label
-    return "unknown"
-
-# ─── CSV laden & aufbereiten ───────────────────────────────────────────────
-def load_raw(path: Path) -> pd.DataFrame:
-    users = int(re.match(r"(\d+)_", path.name).group(1))
-    df = pd.read_csv(path)
-    df = df[df["phase"] == "steady"]
-    df["users"]      = users
-    df["variant"]    = df["db"] + "_" + df["mode"]
-    df["query_no"]   = df["query_no"].astype(int)
-    df["complexity"] = df["query_no"].map(map_complexity).astype(
-        pd.CategoricalDtype(COMPLEXITY_ORDER, ordered=True)
-    )
-    return df
-
 # alle CSVs einlesen
-frames = [load_raw(f) for f in RES_DIR.glob(PATTERN)]
-df = pd.concat(frames, ignore_index=True)
-
-variants = df["variant"].unique()
-
-def cohen_d(sample1:pd.Series, sample2:pd.Series)->float:
-    n1, n2  = len(sample1), len(sample2)
-    if n1 < 2 or n2 < 2:
-        return np.nan
-    s1, s2  = sample1.std(ddof=1), sample2.std(ddof=1)
+# nur Zeilen mit Messwert – NaN-Dauern fallen schon beim Lesen weg
+df = load_steady(list(RES_DIR.glob(PATTERN)),
+                 columns=["users", "concurrency", "variant", "query_no", "duration_ms"],
+                 row_filter=ds.field("duration_ms").is_valid())
+
+variants = np.asarray(df["variant"].unique())
+# alle Variantenpaare (v1 vor v2 in Auftrittsreihenfolge) als Indexvektoren
+pair_i, pair_j = np.triu_indices(len(variants), 1)
+
+# Kennzahlen je Gruppe als Tupel (n, Mittelwert, Varianz) – Arrays Gruppe × Paar
+def welch_t(a1:tuple, a2:tuple)->tuple:
+    (n1,m1,v1),(n2,m2,v2) = a1,a2
+    se1, se2 = v1/n1, v2/n2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t   = (m1-m2)/np.sqrt(se1+se2)
+        dof = (se1+se2)**2/(se1**2/(n1-1) + se2**2/(n2-1))   # Welch-Satterthwaite
+    # zweiseitiger p-Wert direkt über die t-Verteilungsfunktion (ohne rv-Objekt)
+    return t, 2*special.stdtr(dof, -np.abs(t))
+
+def cohen_d(a1:tuple, a2:tuple)->np.ndarray:
+    (n1,m1,v1),(n2,m2,v2) = a1,a2
     # gepoolte Varianz
-    s_pooled = np.sqrt(((n1-1)*s1**2 + (n2-1)*s2**2)/(n1+n2-2))
-    if s_pooled == 0:
-        return np.nan
-    return (sample1.mean() - sample2.mean()) / s_pooled
-
-def compute_percentile(df:pd.DataFrame, group_cols:list,
-                       p:int, out_path:Path, label:str):
-    rows=[]
-    for key,g in df.groupby(group_cols,observed=True):
-        vals=g["duration_ms"].dropna()
-        if vals.empty: continue
-        rows.append(dict(zip(group_cols,key))|{label:np.percentile(vals,p)})
-    pd.DataFrame(rows).sort_values(group_cols,ignore_index=True)\
-        .to_csv(out_path, index=False)
-    print(f"💾 {label} → {out_path}")
-
-def compute_significance(df:pd.DataFrame, group_cols:list, out_path:Path):
-    rows=[]
-    for key,grp in df.groupby(group_cols,observed=True):
-        for v1,v2 in itertools.combinations(variants,2):
-            d1 = grp.loc[grp["variant"]==v1,"duration_ms"].dropna()
-            d2 = grp.loc[grp["variant"]==v2,"duration_ms"].dropna()
-            if len(d1)<2 or len(d2)<2: continue
-            stat,p = stats.ttest_ind(d1,d2,equal_var=False)
-            rows.append(dict(zip(group_cols,key))|{
-                "variant_1":v1,"variant_2":v2,
-                "t_stat":stat,"p_value":p,
-                "significant":p<ALPHA,
-                "cohen_d":cohen_d(d1,d2)        #  ⇦  NEU
-            })
-    pd.DataFrame(rows).sort_values(group_cols+["variant_1","variant_2"],
-                                   ignore_index=True)\
-      .to_csv(out_path,index=False)
+    s_pooled = np.sqrt(((n1-1)*v1 + (n2-1)*v2)/(n1+n2-2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(s_pooled != 0, (m1-m2)/s_pooled, np.nan)
+
+def _plain_keys(frame: pd.DataFrame) -> pd.DataFrame:
+    """Kategorische Schlüssel (complexity) als Text – sortiert wie bisher alphabetisch."""
+    return frame.astype({c: str for c in frame.select_dtypes("category").columns})
+
+def compute_percentiles(df:pd.DataFrame, group_cols:list,
+                        out_p50:Path, out_p99:Path):
+    # p50 und p99 aller Gruppen in EINEM groupby.quantile-Durchlauf
+    q = (df.groupby(group_cols, observed=True)["duration_ms"]
+           .quantile([0.5, 0.99])
+           .unstack()
+           .reset_index()
+           .pipe(_plain_keys)
+           .sort_values(group_cols, ignore_index=True))
+    for p, out_path, label in ((0.5,  out_p50, "p50_duration"),
+                               (0.99, out_p99, "p99_duration")):
+        write_csv(q[group_cols + [p]].rename(columns={p: label}), out_path)
+        print(f"💾 {label} → {out_path}")
+
+def moments(df:pd.DataFrame, keys:list)->pd.DataFrame:
+    """
+    (n, mean, var) von duration_ms je Schlüsselkombination über Sortieren +
+    np.add.reduceat statt Hash-groupby: die Schlüssel werden zu einem int64
+    gepackt (sortierte Codes → Reihenfolge wie groupby), Varianz zweistufig
+    über die Abweichungen vom Gruppenmittel.
+    """
+    packed = np.zeros(len(df), dtype=np.int64)
+    for k in keys:
+        codes, uniq = pd.factorize(df[k], sort=True)
+        packed = packed*len(uniq) + codes
+    order  = np.argsort(packed, kind="stable")
+    packed = packed[order]
+    vals   = df["duration_ms"].to_numpy()[order]
+
+    starts = np.flatnonzero(np.r_[True, packed[1:] != packed[:-1]])
+    n      = np.diff(np.r_[starts, len(vals)])
+    mean   = np.add.reduceat(vals, starts)/n
+    dev    = vals - np.repeat(mean, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.where(n > 1, np.add.reduceat(dev*dev, starts)/(n-1), np.nan)
+
+    out = df[keys].iloc[order[starts]].reset_index(drop=True)
+    return out.assign(n=n, mean=mean, var=var)
+
+def roll_up(fine:pd.DataFrame, keys:list)->pd.DataFrame:
+    """
+    Fasst (n, mean, var) feinerer Gruppen exakt zu gröberen Gruppen zusammen
+    (paarweise Varianz-Kombination nach Chan et al.) – ohne die Rohdaten
+    erneut zu gruppieren.
+    """
+    w = fine.assign(s=fine["n"]*fine["mean"],
+                    m2=((fine["n"]-1)*fine["var"]).fillna(0))
+    g = w.groupby(keys, observed=True)
+    # Streuung der Teil-Mittelwerte um den gemeinsamen Mittelwert
+    mean_all = g["s"].transform("sum")/g["n"].transform("sum")
+    w["m2"] += w["n"]*(w["mean"]-mean_all)**2
+    out = w.groupby(keys, observed=True)[["n","s","m2"]].sum()
+    return pd.DataFrame({
+        "n":    out["n"],
+        "mean": out["s"]/out["n"],
+        "var":  (out["m2"]/(out["n"]-1)).where(out["n"] > 1),
+    }).reset_index()
+
+def compute_significance(m:pd.DataFrame, group_cols:list, out_path:Path):
+    # (n, mean, var) je (Gruppe, Variante) als Matrizen Gruppe × Variante;
+    # über pair_i/pair_j entstehen daraus alle Paare auf einmal (Gruppe × Paar)
+    agg = (m.set_index(group_cols+["variant"])[["n","mean","var"]]
+            .unstack("variant")
+            .reindex(columns=variants, level="variant"))
+    n, mean, var = (agg[c].to_numpy(dtype=float) for c in ("n","mean","var"))
+    a1 = (n[:,pair_i], mean[:,pair_i], var[:,pair_i])
+    a2 = (n[:,pair_j], mean[:,pair_j], var[:,pair_j])
+    stat,p = welch_t(a1, a2)
+    d      = cohen_d(a1, a2)
+
+    ok    = (a1[0]>=2) & (a2[0]>=2)          # NaN (Variante fehlt) fällt hier raus
+    g, k  = np.nonzero(ok)                   # Zeilenindex Gruppe, Spaltenindex Paar
+    res = (agg.index[g].to_frame(index=False)
+              .assign(variant_1=variants[pair_i[k]], variant_2=variants[pair_j[k]],
+                      t_stat=stat[ok], p_value=p[ok],
+                      significant=p[ok]<ALPHA,
+                      cohen_d=d[ok]))
+    write_csv(res.pipe(_plain_keys)
+                  .sort_values(group_cols+["variant_1","variant_2"], ignore_index=True),
+               out_path)
     print(f"💾 significance → {out_path}")
 
-def compute_ci(df: pd.DataFrame, group_cols: list, out_path: Path):
-    rows = []
-    for key, g in df.groupby(group_cols, observed=True):
-        data = g["duration_ms"].dropna()
-        n = len(data)
-        if n < 2:
-            continue
-        m, s = data.mean(), data.std(ddof=1)
-        se   = s / np.sqrt(n)
-        t    = stats.t.ppf(1 - ALPHA/2, df=n-1)
-        rows.append(dict(zip(group_cols, key)) | {
-            "n": n, "mean": m, "std": s,
-            "ci_lower": m - t * se,
-            "ci_upper": m + t * se
-        })
-    (pd.DataFrame(rows)
-       .sort_values(group_cols, ignore_index=True)
-       .to_csv(out_path, index=False))
+def compute_ci(m: pd.DataFrame, group_cols: list, out_path: Path):
+    # Konfidenzgrenzen spaltenweise aus den Gruppenkennzahlen (n, mean, var)
+    ci = m[m["n"] >= 2].pipe(_plain_keys)
+    ci = ci[group_cols + ["n", "mean"]].assign(std=np.sqrt(ci["var"]))
+    se = ci["std"] / np.sqrt(ci["n"])
+    # t-Quantil nur je verschiedenem n berechnen (meist eine Handvoll Werte)
+    n_uniq, n_pos = np.unique(ci["n"], return_inverse=True)
+    t  = stats.t.ppf(1 - ALPHA/2, df=n_uniq - 1)[n_pos]
+    ci = ci.assign(ci_lower=ci["mean"] - t * se,
+                   ci_upper=ci["mean"] + t * se)
+    write_csv(ci.sort_values(group_cols, ignore_index=True), out_path)
     print(f"💾 CI  → {out_path}")
 
 
-# Helper-Calls (ersetzt die Hand-Schleifen)
-compute_ci(df, ["users","concurrency","variant","complexity"], OUT_CI_C)
-compute_ci(df, ["users","concurrency","variant","query_no"],  OUT_CI_Q)
-
-compute_percentile(df, ["users","concurrency","variant","complexity"], 99, OUT_P99_C, "p99_duration")
-compute_percentile(df, ["users","concurrency","variant","complexity"], 50, OUT_P50_C, "p50_duration")
-compute_percentile(df, ["users","concurrency","variant","query_no"],  99, OUT_P99_Q, "p99_duration")
-compute_percentile(df, ["users","concurrency","variant","query_no"],  50, OUT_P50_Q, "p50_duration")
-
-compute_significance(df, ["users","concurrency","complexity"], OUT_SIG_C)
-compute_significance(df, ["users","concurrency","query_no"],   OUT_SIG_Q)
+# Kennzahlen EINMAL auf feinster Ebene (… , query_no) aus den Rohdaten;
+# die Complexity-Ebene wird daraus hochgerechnet statt neu gruppiert
+by_query = moments(df, ["users","concurrency","variant","query_no"])
+by_query["complexity"] = pd.cut(by_query["query_no"], bins=COMPLEXITY_BINS,
+                                labels=COMPLEXITY_ORDER, ordered=True)
+by_complexity = roll_up(by_query, ["users","concurrency","variant","complexity"])
+
+# Die sechs Ausgaben nacheinander – zusammen deutlich unter einer Sekunde,
+# Threads brächten hier kaum Überlappung (pandas/numpy-Glue läuft unter dem GIL)
+compute_ci(by_complexity, ["users","concurrency","variant","complexity"], OUT_CI_C)
+compute_ci(by_query,      ["users","concurrency","variant","query_no"],  OUT_CI_Q)
+# Quantile lassen sich nicht hochrechnen → hier weiter auf den Rohdaten
+compute_percentiles(df, ["users","concurrency","variant","complexity"], OUT_P50_C, OUT_P99_C)
+compute_percentiles(df, ["users","concurrency","variant","query_no"],  OUT_P50_Q, OUT_P99_Q)
+compute_significance(by_complexity, ["users","concurrency","complexity"], OUT_SIG_C)
+compute_significance(by_query,      ["users","concurrency","query_no"],   OUT_SIG_Q)
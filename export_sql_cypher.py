@@ -1,87 +1,35 @@
 # Skript: export_sql_cypher.py
 # Zweck:
-# Dieses Skript konvertiert statische Daten aus einer generierten JSON-Datei in SQL- und Cypher-Skripte.
-# Es werden vier separate Ausgabedateien erstellt:
-# - static_products_data.sql (für PostgreSQL normal + optimized)
-# - static_products_data_normal.cypher (für Neo4j normal)
-# - static_products_data_optimized.cypher (für Neo4j optimized)
-
-import argparse, json, random, shutil
+# Dieses Skript konvertiert statische Produktdaten in SQL-Skripte und Neo4j-Import-CSVs.
+# Es werden folgende Ausgabedateien erstellt:
+# - static_products_data.sql (für PostgreSQL normal + optimized, mit --zstd als .sql.zst)
+# - Product.csv, Category.csv, product_categories.csv in neo4j_normal/import und
+#   neo4j_optimized/import (werden von den Insert-Skripten per neo4j-admin import geladen)
+
+import argparse, io, os, shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from datetime import datetime, timedelta
+import numpy as np
+import orjson
 import pandas as pd
 from tqdm import tqdm
 import html
+import math
 import re
 import csv
 
-# === Helferfunktionen für JSON-Export ===
-
-def stream_write(file, obj):
-    # Schreibt ein JSON-Objekt als einzelne Zeile in die Datei (JSONL-Format)
-    file.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
-
-def open_stream_files(base_dir: Path, tables: list[str]):
-    # Öffnet für jede Tabelle eine eigene .jsonl-Datei zum Schreiben
-    files = {}
-    for name in tables:
-        path = base_dir / f"{name}.jsonl"
-        files[name] = open(path, "w", encoding="utf-8")
-    return files
-
-
-def close_stream_files(files: dict):
-    # Schließt alle geöffneten Stream-Dateien
-    for f in files.values():
-        f.close()
-
+# Zeilen pro mehrzeiligem INSERT … VALUES (…),(…); bzw. pro write-Aufruf bei COPY
+INSERT_BATCH_SIZE = 1000
+# Puffergröße der Ausgabedateien (1 MiB)
+WRITE_BUFFER = 1 << 20
 
-def beautify_json_file(file_path: Path):
-    # Liest die Datei ein und schreibt sie im eingerückten, lesbaren JSON-Format zurück
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def merge_jsonl_to_single_file(stream_dir: Path, final_path: Path):
-    """
-    Führt mehrere .jsonl-Dateien zu einer einzigen verschachtelten JSON-Datei zusammen.
-    Die Dateien werden anschließend gelöscht.
+def build_static_tables(product_csv: Path) -> dict:
     """
-    tables = ["categories", "products", "product_categories"]
-    final_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(final_path, "w", encoding="utf-8") as out:
-        out.write("{\n")
-        for i, table in enumerate(tables):
-            out.write(f'"{table}": [\n')
-            first = True
-            with open(stream_dir / f"{table}.jsonl", "r", encoding="utf-8") as f:
-                for line in f:
-                    if not first:
-                        out.write(",\n")
-                    out.write(line.strip())
-                    first = False
-            out.write("\n]")
-            if i < len(tables) - 1:
-                out.write(",\n")
-        out.write("\n}\n")
-
-    shutil.rmtree(stream_dir)  # Löscht temporäres Verzeichnis mit den Einzeldateien
-    beautify_json_file(final_path)  # Formatiert finale JSON-Datei
-    print(f"✓ Datei erstellt unter: {final_path.resolve()}")
-
-
-def generate_static_json(product_csv: Path, tmp_dir: Path, output_file: Path):
+    Baut aus einem CSV mit Produktdaten die statischen Tabellen (Kategorien, Produkte
+    und ihre Zuordnungen) als Listen von Zeilen-Dicts auf.
     """
-    Konvertiert ein CSV mit Produktdaten in ein JSON-Format, das Kategorien, Produkte
-    und ihre Zuordnungen enthält. Die Daten werden zunächst als JSONL gestreamt und
-    anschließend zu einer finalen JSON-Datei zusammengeführt.
-    """
-    tmp_dir.mkdir(exist_ok=True)
-    stream_files = open_stream_files(tmp_dir, ["categories", "products", "product_categories"])
 
     # CSV einlesen mit notwendigen Spalten
     df = pd.read_csv(
@@ -92,55 +40,65 @@ def generate_static_json(product_csv: Path, tmp_dir: Path, output_file: Path):
     ).dropna()
 
     products_raw = df.reset_index(drop=True)
-    cat_name_to_id, categories = {}, []
-
-    def get_cat_id(name: str) -> int:
-        # Gibt eine eindeutige ID für jede Kategorie zurück (String wird bereinigt)
-        name = name.strip()
-        if name not in cat_name_to_id:
-            cid = len(categories) + 1
-            cat_name_to_id[name] = cid
-            categories.append({"id": cid, "name": name})
-        return cat_name_to_id[name]
-
-    products, product_categories = [], []
-    for idx, row in products_raw.iterrows():
-        pid = idx + 1  # Produkt-IDs beginnen bei 1
-        now = datetime.now()
-        ten_years_ago = now - timedelta(days=365 * 10)
-
-        # Zufällige Zeitstempel in den letzten 10 Jahren generieren
-        created_dt = ten_years_ago + timedelta(seconds=random.randint(0, int((now - ten_years_ago).total_seconds())))
-        created_at = created_dt.isoformat(timespec="seconds")
-        updated_dt = created_dt + timedelta(seconds=random.randint(0, int((now - created_dt).total_seconds())))
-        updated_at = updated_dt.isoformat(timespec="seconds")
-
-        # Produkt-Objekt erstellen
-        products.append({
-            "id": pid,
-            "name": str(row.title)[:255],
-            "description": None,
-            "price": float(row.price),
-            "stock": random.randint(1, 100),
-            "created_at": created_at,
-            "updated_at": updated_at
-        })
-
-        # Kategorie-Zuordnungen auflösen (Mehrfachzuordnungen pro Produkt möglich)
-        for cat in {c.strip() for c in row.categoryName.split(",") if c.strip()}:
-            cid = get_cat_id(cat)
-            product_categories.append({"product_id": pid, "category_id": cid})
-
-    # Streaming-Dateien schreiben
-    for c in categories:
-        stream_write(stream_files["categories"], c)
-    for p in products:
-        stream_write(stream_files["products"], p)
-    for pc in product_categories:
-        stream_write(stream_files["product_categories"], pc)
-
-    close_stream_files(stream_files)
-    merge_jsonl_to_single_file(tmp_dir, output_file)
+    n = len(products_raw)
+    rng = np.random.default_rng()
+
+    # Zufällige Zeitstempel in den letzten 10 Jahren – für alle Produkte auf einmal
+    now = pd.Timestamp.now().floor("s")
+    ten_years_ago = now - pd.Timedelta(days=365 * 10)
+    span = int((now - ten_years_ago).total_seconds())
+    created_dt = ten_years_ago + pd.to_timedelta(rng.integers(0, span, n, endpoint=True), unit="s")
+    # updated_at gleichverteilt zwischen created_at und jetzt
+    rest = ((now - created_dt).total_seconds()).astype(np.int64)
+    updated_dt = created_dt + pd.to_timedelta(
+        np.floor(rng.random(n) * (rest + 1)).astype(np.int64), unit="s")
+
+    # Produkt-Objekte erstellen (Produkt-IDs beginnen bei 1)
+    products = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": products_raw["title"].astype(str).str.slice(0, 255),
+        "description": None,
+        "price": products_raw["price"].astype(float),
+        "stock": rng.integers(1, 100, n, endpoint=True),
+        "created_at": created_dt.strftime("%Y-%m-%dT%H:%M:%S"),
+        "updated_at": updated_dt.strftime("%Y-%m-%dT%H:%M:%S"),
+    }).to_dict("records")
+
+    # Kategorie-Zuordnungen auflösen (Mehrfachzuordnungen pro Produkt möglich):
+    # aufsplitten, bereinigen, Duplikate je Produkt entfernen, IDs nach erstem Auftreten
+    cats = products_raw["categoryName"].str.split(",").explode().str.strip()
+    cats = cats[cats != ""]
+    cats = cats[~pd.MultiIndex.from_arrays([cats.index, cats.to_numpy()]).duplicated()]
+    cat_codes, cat_names = pd.factorize(cats)
+    categories = [{"id": i + 1, "name": name} for i, name in enumerate(cat_names)]
+    product_categories = pd.DataFrame({
+        "product_id": cats.index.to_numpy() + 1,
+        "category_id": cat_codes + 1,
+    }).to_dict("records")
+
+    return {"categories": categories,
+            "products": products,
+            "product_categories": product_categories}
+
+
+def write_static_json(data: dict, output_file: Path):
+    """
+    Schreibt die statischen Tabellen kompakt (ohne Einrückung) in einem Durchgang
+    in die Zieldatei. Die Datei wird nur maschinell gelesen, und das Parsen ist auf
+    kompaktem JSON schneller.
+    """
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, "wb") as f:
+        f.write(orjson.dumps(data))                  # UTF-8-Bytes, kompakt
+    print(f"✓ Datei erstellt unter: {output_file.resolve()}")
+
+
+def generate_static_json(product_csv: Path, output_file: Path):
+    """
+    Konvertiert ein CSV mit Produktdaten in ein JSON-Format, das Kategorien, Produkte
+    und ihre Zuordnungen enthält.
+    """
+    write_static_json(build_static_tables(product_csv), output_file)
 
 
 # === Exporter ===
@@ -148,11 +106,74 @@ def generate_static_json(product_csv: Path, tmp_dir: Path, output_file: Path):
 def escape_sql_value(value):
     """
     Wandelt einen Wert in einen SQL-sicheren String um (z. B. Escaping von Hochkommas),
-    oder gibt NULL zurück.
+    oder gibt NULL zurück. Ganzzahlen und endliche Floats werden ohne Quotes geschrieben.
     """
     if value is None:
         return "NULL"
-    return "'" + str(value).replace("'", "''") + "'"
+    kind = type(value)
+    if kind is int or (kind is float and math.isfinite(value)):
+        return repr(value)
+    return _quote_sql_string(value if kind is str else str(value))
+
+
+@lru_cache(maxsize=8192)
+def _quote_sql_string(s: str) -> str:
+    # Kategorienamen und doppelte Produkttitel wiederholen sich → Cache
+    if "'" in s:
+        s = s.replace("'", "''")
+    return "'" + s + "'"
+
+
+# Escaping für das COPY-Textformat in einem translate-Durchlauf
+_COPY_TRANS = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_text_value(value) -> str:
+    """
+    Wandelt einen Wert in ein Feld des COPY-Textformats um: NULL wird zu \\N,
+    Backslash, Tab und Zeilenumbrüche werden escaped.
+    """
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_TRANS)
+
+
+def write_sql_table(sql_file, table: str, rows: list[dict], sql_format: str = "insert",
+                    batch_size: int = INSERT_BATCH_SIZE):
+    """
+    Schreibt eine Tabelle in die SQL-Datei – entweder als mehrzeilige INSERT-Befehle
+    (je batch_size Zeilen ein Statement) oder als ein COPY … FROM STDIN-Block
+    (Textformat, Ende mit \\.), den die Insert-Skripte per copy_expert in einem
+    Rutsch laden.
+    """
+    columns = ", ".join(rows[0].keys())                 # Schema ist je Tabelle konstant
+    if sql_format == "copy":
+        sql_file.write(f"COPY {table} ({columns}) FROM STDIN;\n")
+        it = iter(rows)
+        while batch := list(islice(it, batch_size)):
+            sql_file.write("".join(
+                "\t".join(copy_text_value(v) for v in row.values()) + "\n" for row in batch))
+        sql_file.write("\\.\n")
+        return
+    insert_prefix = f"INSERT INTO {table} ({columns}) VALUES\n"   # einmal pro Tabelle
+    it = iter(rows)
+    while batch := list(islice(it, batch_size)):
+        values = ",\n".join(
+            "(" + ", ".join(escape_sql_value(v) for v in row.values()) + ")" for row in batch)
+        sql_file.write(insert_prefix + values + ";\n")
+
+
+# Alle Einzelzeichen-Ersetzungen für Cypher in einer Tabelle → ein translate-Durchlauf
+_CYPHER_TRANS = str.maketrans({
+    "\\": "\\\\",                     # Backslashes escapen
+    "'": "\\'", '"': '\\"',           # einfache/doppelte Anführungszeichen escapen
+    "’": "\\'", "‘": "\\'",           # Unicode-Einzelzeichen
+    "“": '\\"', "”": '\\"',           # Unicode-Doppelte Anführungszeichen
+    "–": "-",                         # Gedankenstrich zu normalem Minus
+    "\n": " ", "\r": " ", "\t": " ",  # Zeilenumbrüche
+    ";": ",",
+})
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
 
 
 def escape_cypher_string(value: str) -> str:
@@ -162,156 +183,205 @@ def escape_cypher_string(value: str) -> str:
     """
     if not value:
         return ""
-    s = html.unescape(str(value))                     # HTML-Entities (z. B. &quot; → ")
-    s = s.replace("\\", "\\\\")                       # Backslashes escapen
-    s = s.replace("'", "\\'")                         # Einfache Anführungszeichen escapen
-    s = s.replace('"', '\\"')                         # Doppelte Anführungszeichen escapen
-    s = s.replace("’", "\\'").replace("‘", "\\'")     # Unicode-Einzelzeichen
-    s = s.replace("“", '\\"').replace("”", '\\"')     # Unicode-Doppelte Anführungszeichen
-    s = s.replace("–", "-")                           # Gedankenstrich zu normalem Minus
-    s = s.replace("\n", " ").replace("\r", " ").replace("\t", " ")  # Zeilenumbrüche
-    s = s.replace(";", ",")
-    s = re.sub(r"\s{2,}", " ", s)                     # Mehrfache Leerzeichen entfernen
+    s = html.unescape(str(value)).translate(_CYPHER_TRANS)  # HTML-Entities, dann Escaping
+    s = _MULTI_SPACE_RE.sub(" ", s)                         # Mehrfache Leerzeichen entfernen
     return s.strip()
 
 
-def export_static_tables_to_sql_and_cypher(json_path: Path,
+STATIC_TABLES = ["categories", "products", "product_categories"]
+
+# Spalten der Neo4j-Import-CSVs (Header im neo4j-admin-Format) und Dateinamen
+NEO4J_CSV_TABLES = {
+    "products": [
+        "product_id:ID(Product)",
+        "id:int",
+        "name", "description",
+        "price:float", "stock:int",
+        "created_at:datetime", "updated_at:datetime"
+    ],
+    "categories": [
+        "category_id:ID(Category)",
+        "id:int",
+        "name"
+    ],
+    "product_categories": [
+        "product_id:START_ID(Product)",
+        "category_id:END_ID(Category)",
+        ":TYPE"
+    ]
+}
+
+NEO4J_CSV_FILENAMES = {
+    "products": "Product.csv",
+    "categories": "Category.csv",
+    "product_categories": "product_categories.csv"
+}
+
+
+def write_sql_file(path: Path, data: dict, sql_format: str = "insert",
+                   batch_size: int = INSERT_BATCH_SIZE):
+    """
+    Schreibt alle statischen Tabellen in eine SQL-Datei. BEGIN/COMMIT → psql lädt
+    die Datei in einer Transaktion. Endet der Pfad auf .zst, wird zstd-komprimiert
+    geschrieben (laden z. B. per zstdcat … | psql).
+    """
+    if path.suffix == ".zst":
+        import zstandard                             # nur für --zstd benötigt
+        writer = zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(open(path, "wb"))
+        sql_out = io.TextIOWrapper(writer, encoding="utf-8")
+    else:
+        sql_out = open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
+    with sql_out as sql_file:
+        sql_file.write("BEGIN;\n")
+        for table in tqdm(STATIC_TABLES, desc=f"SQL Export to {path.name}", ncols=80):
+            rows = data.get(table, [])
+            if not rows:
+                continue
+            write_sql_table(sql_file, table, rows, sql_format, batch_size)
+        sql_file.write("COMMIT;\n")
+
+
+def write_neo4j_csv(path: Path, table: str, rows: list[dict]):
+    """
+    Schreibt eine Tabelle als CSV im Neo4j-Importformat. Die Quellspalte je
+    Header-Eintrag wird einmal pro Tabelle bestimmt, danach schreibt csv.writer
+    reine Wertelisten.
+    """
+    header = NEO4J_CSV_TABLES[table]
+    sample = rows[0]
+
+    # Quellschlüssel je Spalte; ..._id-Spalten werden bei Bedarf aus "id" gefüllt,
+    # ":TYPE" ergibt den leeren Schlüssel und bekommt den Beziehungstyp
+    keys = []
+    for col in header:
+        base = col.split(":")[0]
+        if base.endswith("_id") and base not in sample and "id" in sample:
+            base = "id"
+        keys.append(base)
+    rel_type = "BELONGS_TO" if table == "product_categories" else ""
+
+    def to_row(row: dict) -> list:
+        return [rel_type if key == "" else ("" if (v := row.get(key)) is None else v)
+                for key in keys]
+
+    with open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER) as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(header)
+        writer.writerows(map(to_row, rows))
+
+
+def export_static_tables_to_sql_and_cypher(static_data: dict | Path,
                                            sql_normal_path: Path,
                                            sql_optimized_path: Path,
-                                           cypher_normal_path: Path,
-                                           cypher_optimized_path: Path):
+                                           sql_normal_format: str = "insert",
+                                           sql_optimized_format: str = "copy",
+                                           compress: bool = False,
+                                           batch_size: int = INSERT_BATCH_SIZE):
     """
     Exportiert die statischen Daten (Produkte, Kategorien und deren Verknüpfungen)
-    aus der JSON-Datei in:
-      - SQL INSERT-Befehle für PostgreSQL (normal + optimiert)
+    in:
+      - SQL für PostgreSQL (normal + optimiert), als INSERT-Befehle oder COPY-Blöcke –
+        standardmäßig INSERT für normal und COPY … FROM STDIN für optimiert
       - CSV-Dateien im Neo4j-Importformat (normal + optimiert)
+    static_data sind entweder die Tabellen aus build_static_tables() direkt aus dem
+    Speicher oder der Pfad zu einer static.json. Die voneinander unabhängigen
+    Ausgabedateien werden parallel in einem Thread-Pool geschrieben. Mit compress
+    landen die SQL-Skripte zstd-komprimiert in <name>.sql.zst.
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    static_tables = ["categories", "products", "product_categories"]
-
-    for path in [sql_normal_path, sql_optimized_path, cypher_normal_path, cypher_optimized_path]:
-        path.parent.mkdir(parents=True, exist_ok=True)
-
-    # ────────── SQL-Export ──────────
+    if isinstance(static_data, dict):
+        data = static_data
+    else:
+        with open(static_data, "rb") as f:
+            data = orjson.loads(f.read())
+
+    # Komprimierte bzw. unkomprimierte Variante: die jeweils andere (veraltete)
+    # Datei entfernen, damit die Insert-Skripte nicht die alte laden
+    plain = [sql_normal_path, sql_optimized_path]
+    zst = [p.with_name(p.name + ".zst") for p in plain]
+    sql_normal_path, sql_optimized_path = zst if compress else plain
     for path in [sql_normal_path, sql_optimized_path]:
-        with open(path, "w", encoding="utf-8") as sql_file:
-            for table in tqdm(static_tables, desc=f"SQL Export to {path.name}", ncols=80):
-                rows = data.get(table, [])
-                if not rows:
-                    continue
-                for row in rows:
-                    columns = ", ".join(row.keys())
-                    values = ", ".join(escape_sql_value(v) for v in row.values())
-                    sql_file.write(f"INSERT INTO {table} ({columns}) VALUES ({values});\n")
-
-    # ────────── Neo4j CSV-Export ──────────
-    csv_tmp_dir = Path("tmp_csv_export")
-    csv_tmp_dir.mkdir(parents=True, exist_ok=True)
-
-    csv_tables = {
-        "products": [
-            "product_id:ID(Product)",
-            "id:int",
-            "name", "description",
-            "price:float", "stock:int",
-            "created_at:datetime", "updated_at:datetime"
-        ],
-        "categories": [
-            "category_id:ID(Category)",
-            "id:int",
-            "name"
-        ],
-        "product_categories": [
-            "product_id:START_ID(Product)",
-            "category_id:END_ID(Category)",
-            ":TYPE"
-        ]
-    }
-
-    table_to_filename = {
-        "products": "Product.csv",
-        "categories": "Category.csv",
-        "product_categories": "product_categories.csv"
-    }
-
-    for table, header in csv_tables.items():
-        rows = data.get(table, [])
-        if not rows:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    for path in (plain if compress else zst):
+        path.unlink(missing_ok=True)
+
+    # Neo4j-CSVs direkt ins Import-Verzeichnis von normal schreiben,
+    # optimized bekommt danach Hardlinks auf dieselben Dateien
+    csv_dir, csv_link_dir = Path("neo4j_normal/import"), Path("neo4j_optimized/import")
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    csv_link_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # ────────── SQL-Export ──────────
+        # Bei gleichem Format bekommen beide PostgreSQL-Varianten denselben Inhalt:
+        # einmal schreiben, danach kopieren
+        same_sql = sql_normal_format == sql_optimized_format
+        jobs = [pool.submit(write_sql_file, sql_normal_path, data, sql_normal_format, batch_size)]
+        if not same_sql:
+            jobs.append(pool.submit(write_sql_file, sql_optimized_path, data,
+                                    sql_optimized_format, batch_size))
+
+        # ────────── Neo4j CSV-Export ──────────
+        for table, filename in NEO4J_CSV_FILENAMES.items():
+            rows = data.get(table, [])
+            if rows:
+                jobs.append(pool.submit(write_neo4j_csv, csv_dir / filename, table, rows))
+
+        for job in jobs:
+            job.result()                             # Fehler aus den Threads weiterreichen
+
+    if same_sql and sql_optimized_path.resolve() != sql_normal_path.resolve():
+        shutil.copyfile(sql_normal_path, sql_optimized_path)
+
+    print(f"📁 CSVs geschrieben nach: {csv_dir.resolve()}")
+
+    # Hardlinks statt zweiter Kopie; über Dateisystemgrenzen hinweg wird kopiert
+    for filename in NEO4J_CSV_FILENAMES.values():
+        src, dst = csv_dir / filename, csv_link_dir / filename
+        if not src.exists():
             continue
-
-        filename = table_to_filename[table]
-        path     = csv_tmp_dir / filename
-
-        with open(path, "w", encoding="utf-8", newline="") as f_out:
-            writer = csv.DictWriter(f_out, fieldnames=header)
-            writer.writeheader()
-
-            for row in rows:
-                row_out = {}
-
-                for col in header:
-                    if col == ":TYPE":
-                        continue
-
-                    base = col.split(":")[0]
-
-                    # Füllt ..._id-Spalten automatisch, wenn nötig
-                    if base.endswith("_id") and base not in row and "id" in row:
-                        row_out[col] = row["id"]
-                    else:
-                        row_out[col] = row.get(base) if row.get(base) is not None else ""
-
-                if table == "product_categories":
-                    row_out[":TYPE"] = "BELONGS_TO"
-
-                writer.writerow(row_out)
-
-    # Kopiere CSVs in beide Neo4j-Verzeichnisse
-    for target_dir in ["neo4j_normal/import", "neo4j_optimized/import"]:
-        target_path = Path(target_dir)
-        target_path.mkdir(parents=True, exist_ok=True)
-        for file in csv_tmp_dir.glob("*.csv"):
-            shutil.copy(file, target_path / file.name)
-        print(f"📁 CSVs kopiert nach: {target_path.resolve()}")
-
-    shutil.rmtree(csv_tmp_dir)
+        dst.unlink(missing_ok=True)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy(src, dst)
+    print(f"📁 CSVs verlinkt nach: {csv_link_dir.resolve()}")
 
     print("\n✅ Export abgeschlossen.")
 
 
 # === CLI-Wrapper ===
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Generiert und exportiert statische Produktdaten als SQL- und Cypher-Dateien.")
+    parser = argparse.ArgumentParser(description="Generiert und exportiert statische Produktdaten als SQL-Skripte und Neo4j-Import-CSVs.")
     parser.add_argument("--product-csv", type=str, default="product_data/product_dataset.csv",
                         help="Pfad zur CSV-Datei mit Produktdaten")
-    parser.add_argument("--tmp", type=str, default="tmp_static_gen",
-                        help="Temporärer Ordner für Stream-Dateien")
-    parser.add_argument("--static-json", type=str, default="static.json",
-                        help="Zielpfad für temporäre JSON-Datei")
+    parser.add_argument("--static-json", type=str, default=None,
+                        help="optional: Tabellen zusätzlich als JSON-Datei ablegen")
 
     parser.add_argument("--sql-normal", type=str, default="postgresql_normal/static_products_data.sql")
     parser.add_argument("--sql-optimized", type=str, default="postgresql_optimized/static_products_data.sql")
-    parser.add_argument("--cypher-normal", type=str, default="neo4j_normal/static_products_data_normal.cypher")
-    parser.add_argument("--cypher-optimized", type=str, default="neo4j_optimized/static_products_data_optimized.cypher")
+    parser.add_argument("--sql-normal-format", choices=["insert", "copy"], default="insert",
+                        help="SQL für PostgreSQL normal als INSERT-Befehle oder als COPY … FROM STDIN-Blöcke")
+    parser.add_argument("--sql-optimized-format", choices=["insert", "copy"], default="copy",
+                        help="SQL für PostgreSQL optimiert als INSERT-Befehle oder als COPY … FROM STDIN-Blöcke")
+    parser.add_argument("--insert-batch-size", type=int, default=INSERT_BATCH_SIZE,
+                        help="Zeilen pro mehrzeiligem INSERT-Statement")
+    parser.add_argument("--zstd", action="store_true",
+                        help="SQL-Skripte zstd-komprimiert als *.sql.zst schreiben")
     args = parser.parse_args()
 
-    # 1. Generiere static.json aus CSV-Daten
-    generate_static_json(Path(args.product_csv), Path(args.tmp), Path(args.static_json))
+    # 1. Statische Tabellen aus den CSV-Daten aufbauen – sie bleiben im Speicher,
+    #    kein Umweg über eine temporäre static.json
+    data = build_static_tables(Path(args.product_csv))
+    if args.static_json:
+        write_static_json(data, Path(args.static_json))
 
-    # 2. Exportiere Inhalte der JSON-Datei in SQL- und Cypher-kompatible Formate
+    # 2. Exportiere die Tabellen als SQL-Skripte und Neo4j-Import-CSVs
     export_static_tables_to_sql_and_cypher(
-        Path(args.static_json),
+        data,
         Path(args.sql_normal),
         Path(args.sql_optimized),
-        Path(args.cypher_normal),
-        Path(args.cypher_optimized)
+        args.sql_normal_format,
+        args.sql_optimized_format,
+        args.zstd,
+        args.insert_batch_size
     )
-
-    # 3. Lösche temporäre JSON-Datei zur Bereinigung
-    try:
-        Path(args.static_json).unlink()
-        print(f"🧹 static.json gelöscht.")
-    except Exception as e:
-        print(f"⚠ Fehler beim Löschen von static.json: {e}")
\ No newline at end of file
@@ -1,7 +1,10 @@
-import json, argparse, random
+import argparse, os, random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 from random import randint
+import numpy as np
+import orjson
 import pandas as pd
 from faker import Faker
 from tqdm import tqdm
@@ -11,37 +14,88 @@ import shutil
 ORDER_STATI = ["NEW", "PAID", "SHIPPED", "COMPLETED", "CANCELLED"]
 PAY_METHODS = ["card", "paypal", "invoice"]
 CARRIERS = ["DHL", "Hermes", "DPD", "GLS"]
+FAKER_POOL_SIZE = 10_000  # max. vorab erzeugte Faker-Werte je Feld
+USER_BLOCK_SIZE = 1_000   # Nutzer je Block (fest, unabhängig von --workers)
 
 faker = Faker("de_DE")
-used_emails: set[str] = set()
-wishlist_pairs: set[tuple[int,int]] = set()
 
 
-# Hilfsfunktion für Zufallsdatum im aktuellen Jahr
-def random_date_this_year():
-    now = datetime.now()
+# Hilfsfunktion für Zufallsdatum im aktuellen Jahr (bis zum übergebenen Zeitpunkt now)
+def random_date_this_year(now: datetime) -> str:
     start_of_year = datetime(now.year, 1, 1)
     max_seconds = int((now - start_of_year).total_seconds())
     offset = randint(0, max_seconds)
     return (start_of_year + timedelta(seconds=offset)).isoformat(timespec="seconds")
 
 
-# Generiert ein zufälliges Datum zwischen zwei Zeitpunkten
-def random_date_between(start: str, end: str) -> str:
+# Generiert ein zufälliges Datum zwischen einem Zeitpunkt und end_dt
+def random_date_between(start: str, end_dt: datetime) -> str:
     start_dt = datetime.fromisoformat(start)
-    end_dt = datetime.now() if isinstance(end, str) and end == "now" else datetime.fromisoformat(end)
     delta = end_dt - start_dt
     offset = timedelta(seconds=random.randint(0, int(delta.total_seconds())))
     return (start_dt + offset).isoformat(timespec="seconds")
 
 
-# Öffnet eine Sammlung von JSONL-Dateien zum Schreiben, je Tabelle eine
+# Tabellen des Nutzungsdatensatzes in der Reihenfolge der finalen JSON-Datei
+TABLES = [
+    "users", "addresses",
+    "orders", "order_items", "payments", "shipments",
+    "reviews", "cart_items", "wishlists",
+    "product_views", "product_purchases"
+]
+
+# Fremd- und Primärschlüssel, die beim Zusammenführen um den Block-Offset verschoben
+# werden: Feld → Tabelle, deren Zeilenanzahl in den vorherigen Blöcken den Offset gibt.
+# users.id ist die globale Nutzer-ID und wird nicht verschoben.
+ID_FIELDS = {
+    "addresses": {"id": "addresses"},
+    "orders": {"id": "orders"},
+    "order_items": {"id": "order_items", "order_id": "orders"},
+    "payments": {"id": "payments", "order_id": "orders"},
+    "shipments": {"id": "shipments", "order_id": "orders"},
+    "reviews": {"id": "reviews"},
+    "cart_items": {"id": "cart_items"},
+    "product_views": {"id": "product_views"},
+    "product_purchases": {"id": "product_purchases"},
+}
+
+
+# Schreibt die Datensätze einer Tabelle direkt als Inhalt eines JSON-Arrays (ohne
+# Klammern) in eine Teildatei – kompakt, ohne spätere Neuformatierung. Kodierte
+# Einträge werden gesammelt und je FLUSH_EVERY Stück mit einem write weggeschrieben.
+class JsonArrayWriter:
+    FLUSH_EVERY = 10_000
+
+    def __init__(self, path: Path):
+        self.path    = path
+        self.file    = open(path, "wb", buffering=1 << 20)
+        self.count   = 0                      # Anzahl aller geschriebenen Einträge
+        self.pending = []
+        self.written = False
+
+    def write(self, obj):
+        self.pending.append(orjson.dumps(obj))  # direkt UTF-8-Bytes
+        self.count += 1
+        if len(self.pending) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        chunk = b",\n".join(self.pending)
+        self.file.write(b",\n" + chunk if self.written else chunk)
+        self.written = True
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+# Öffnet je Tabelle einen JsonArrayWriter
 def open_stream_files(base_dir: Path, tables: list[str]):
-    files = {}
-    for name in tables:
-        path = base_dir / f"{name}.jsonl"
-        files[name] = open(path, "w", encoding="utf-8")
-    return files
+    base_dir.mkdir(parents=True, exist_ok=True)
+    return {name: JsonArrayWriter(base_dir / f"{name}.json") for name in tables}
 
 
 # Schließt alle geöffneten Stream-Dateien
@@ -50,119 +104,117 @@ def close_stream_files(files: dict):
         f.close()
 
 
-# Schreibt ein JSON-Objekt zeilenweise in eine Datei (JSONL-Format)
-def stream_write(file, obj):
-    file.write(json.dumps(obj, ensure_ascii=False) + "\n")
+# Schreibt ein JSON-Objekt als nächsten Eintrag des Tabellen-Arrays
+def stream_write(writer: JsonArrayWriter, obj):
+    writer.write(obj)
 
 
-# Hauptfunktion zur Generierung eines vollständigen Nutzungsdatensatzes
-def build_dataset(num_users: int, data_dir: Path | str = "product_data", out_dir: Path | str = "output_streamed", final_dir: Path | str = "output") -> None:
-    # Vorbereitung der Verzeichnisse
-    data_dir  = Path(data_dir)
-    out_dir   = Path(out_dir)
-    final_dir = Path(final_dir)
-    out_dir.mkdir(exist_ok=True)
-    
-    # Öffne Stream-Dateien für alle benötigten Tabellen
-    stream_files = open_stream_files(out_dir, [
-        "users", "addresses",
-        "orders", "order_items", "payments", "shipments",
-        "reviews", "cart_items", "wishlists",
-        "product_views", "product_purchases"
-    ])
+# Gemeinsame Daten aller Blöcke (Produktspalten, Faker-Pools, Referenzzeitpunkt) –
+# werden je Prozess einmal über init_worker gesetzt statt mit jedem Block übertragen
+shared_data: tuple = ()
 
-    # Lade Produktdaten aus CSV und berechne Bewertungs-Gewicht
-    df = pd.read_csv(
-        data_dir / "product_dataset.csv",
-        usecols=["title", "price", "categoryName", "reviews"],
-        encoding="utf-8",
-        converters={"reviews": lambda x: int(str(x).replace(",", "").strip()) if x else 0}
-    ).dropna()
-    max_reviews = df["reviews"].max()
-    df["review_weight"] = df["reviews"].apply(lambda r: 0.05 + 0.85 * (r / max_reviews if max_reviews else 0))
-
-    # Produkte extrahieren und Gewichte zuweisen
-    products_raw = df.reset_index(drop=True)
-    cat_name_to_id, categories = {}, []
-    def get_cat_id(name: str) -> int:
-        name = name.strip()
-        if name not in cat_name_to_id:
-            cid = len(categories) + 1
-            cat_name_to_id[name] = cid
-            categories.append({"id": cid, "name": name})
-        return cat_name_to_id[name]
-
-    products, prod_weights = [], {}
-    pid = 1
-    for idx, row in products_raw.iterrows():
-        title = str(row.title)[:255]
-        price = float(row.price)
-        products.append({
-            "id": pid,
-            "name": title,
-            "price": price
-        })
-        prod_weights[pid] = float(products_raw.loc[idx, "review_weight"])
-        pid += 1
 
-    # ID-Zähler für alle Tabellen initialisieren
+def init_worker(products: tuple, pools: tuple, now: datetime) -> None:
+    global shared_data
+    shared_data = (products, pools, now)
+
+
+# Generiert die Nutzer uid_start … uid_stop-1 samt abhängiger Entitäten in eigene
+# Teildateien. Läuft als eigener Prozess; die IDs jeder Tabelle zählen blocklokal ab 1
+# und werden beim Zusammenführen um die Zeilenanzahl der vorherigen Blöcke verschoben.
+def generate_user_chunk(task: tuple) -> dict[str, int]:
+    uid_start, uid_stop, chunk_dir, seed = task
+    products, pools, now = shared_data
+    prod_ids, prod_prices, prod_weights = products
+    name_pool, email_pool, street_pool, city_pool, zip_pool = pools
+    n_products = len(prod_ids)
+    n_users = uid_stop - uid_start
+
+    # Eigener Zufallsstrom je Block: numpy-Generator für die Massenziehungen,
+    # random/Faker für die übrigen Einzelwerte – beide aus derselben SeedSequence
+    rng = np.random.default_rng(seed)
+    py_seed = int(seed.generate_state(1, np.uint64)[0])
+    random.seed(py_seed)
+    faker.seed_instance(py_seed)
+
+    # Anzahlen je Nutzer blockweise vektorisiert ziehen statt einzeln pro Schleifendurchlauf
+    user_names  = [name_pool[i] for i in rng.integers(0, len(name_pool), size=n_users).tolist()]
+    num_addrs   = rng.choice([1, 2, 3], size=n_users, p=[0.7, 0.25, 0.05]).tolist()
+    num_orders  = rng.integers(1, 3, size=n_users, endpoint=True).tolist()
+    num_carts   = rng.integers(0, 3, size=n_users, endpoint=True).tolist()
+    num_wishes  = np.minimum(rng.integers(1, 5, size=n_users, endpoint=True), n_products).tolist()
+    num_views   = rng.integers(1, 10, size=n_users, endpoint=True).tolist()
+
+    # Werte je Bestellung ebenfalls vorab für den ganzen Block ziehen
+    total_orders  = sum(num_orders)
+    order_status  = rng.choice(ORDER_STATI, size=total_orders).tolist()
+    order_weeks   = rng.integers(1, 3, size=total_orders, endpoint=True).tolist()
+    order_n_items = rng.integers(1, 4, size=total_orders, endpoint=True).tolist()
+    paid_hours    = rng.integers(1, 48, size=total_orders, endpoint=True).tolist()
+    pay_methods   = rng.choice(PAY_METHODS, size=total_orders).tolist()
+    o = 0  # laufender Index in die Bestellungs-Arrays
+
+    stream_files = open_stream_files(chunk_dir, TABLES)
+
+    # Blocklokale ID-Zähler für alle Tabellen
     addr_id = order_id = item_id = pay_id = ship_id = rev_id = cart_id = view_id = pur_id = 1
 
-    # Hilfsfunktion zur Generierung eindeutiger E-Mails
-    def unique_email() -> str:
-        email = faker.email()
-        while email in used_emails:
-            email = faker.email()
-        used_emails.add(email)
-        return email
+    # Hilfsfunktion zur Generierung eindeutiger E-Mails: Adresse aus dem Pool,
+    # durch die Nutzer-ID im lokalen Teil eindeutig gemacht – ohne Duplikat-Set,
+    # da keine zwei Nutzer dieselbe ID haben
+    def unique_email(uid: int) -> str:
+        local, domain = random.choice(email_pool)
+        return f"{local}.{uid}@{domain}"
 
     # Nutzer + abhängige Entitäten generieren
-    for uid in tqdm(range(1, num_users + 1), desc="Generiere Nutzer"):
+    for k, uid in enumerate(range(uid_start, uid_stop)):
         # Nutzer und Adressen
         stream_write(stream_files["users"], {
-            "id": uid, "name": faker.name(), "email": unique_email(),
-            "created_at": random_date_this_year()
+            "id": uid, "name": user_names[k], "email": unique_email(uid),
+            "created_at": random_date_this_year(now)
         })
-        num_addr = random.choices([1, 2, 3], weights=[0.7, 0.25, 0.05])[0]
+        num_addr = num_addrs[k]
         primary_set = False
         for i in range(num_addr):
             stream_write(stream_files["addresses"], {
                 "id": addr_id, "user_id": uid,
-                "street": faker.street_address(), "city": faker.city(),
-                "zip": faker.postcode(), "country": "Deutschland",
+                "street": random.choice(street_pool), "city": random.choice(city_pool),
+                "zip": random.choice(zip_pool), "country": "Deutschland",
                 "is_primary": not primary_set or (i == num_addr - 1 and not primary_set)
             })
             addr_id += 1
             primary_set = True
 
         # Bestellungen + Items + Reviews
-        for _ in range(random.randint(1, 3)):
-            created_ts = random_date_this_year()
-            updated_ts = (datetime.fromisoformat(created_ts) + timedelta(weeks=random.randint(1, 3))).isoformat(timespec="seconds")
-            status = random.choice(ORDER_STATI)
-            items = random.sample(products, k=random.randint(1, 4))
+        for _ in range(num_orders[k]):
+            created_ts = random_date_this_year(now)
+            created_dt = datetime.fromisoformat(created_ts)
+            updated_ts = (created_dt + timedelta(weeks=order_weeks[o])).isoformat(timespec="seconds")
+            status = order_status[o]
+            items = random.sample(range(n_products), k=order_n_items[o])
             total = 0.0
-            for prod in items:
+            for i in items:
+                prod_id, price = prod_ids[i], prod_prices[i]
                 qty = random.randint(1, 3)
                 stream_write(stream_files["order_items"], {
-                    "id": item_id, "order_id": order_id, "product_id": prod["id"],
-                    "quantity": qty, "price": prod["price"]
+                    "id": item_id, "order_id": order_id, "product_id": prod_id,
+                    "quantity": qty, "price": price
                 })
                 item_id += 1
                 stream_write(stream_files["product_purchases"], {
-                    "id": pur_id, "user_id": uid, "product_id": prod["id"],
+                    "id": pur_id, "user_id": uid, "product_id": prod_id,
                     "purchased_at": created_ts
                 })
                 stream_write(stream_files["product_views"], {
-                    "id": view_id, "user_id": uid, "product_id": prod["id"],
-                    "viewed_at": (datetime.fromisoformat(created_ts) - timedelta(minutes=random.randint(1, 10))).isoformat(timespec="seconds")
+                    "id": view_id, "user_id": uid, "product_id": prod_id,
+                    "viewed_at": (created_dt - timedelta(minutes=random.randint(1, 10))).isoformat(timespec="seconds")
                 })
                 view_id += 1
                 pur_id += 1
-                total += qty * prod["price"]
-                if random.random() < prod_weights[prod["id"]]:
+                total += qty * price
+                if random.random() < prod_weights[i]:
                     stream_write(stream_files["reviews"], {
-                        "id": rev_id, "user_id": uid, "product_id": prod["id"],
+                        "id": rev_id, "user_id": uid, "product_id": prod_id,
                         "rating": random.randint(1, 5), "comment": None,
                         "created_at": created_ts
                     })
@@ -173,117 +225,199 @@ def build_dataset(num_users: int, data_dir: Path | str = "product_data", out_dir
                 "total": round(total, 2), "created_at": created_ts, "updated_at": updated_ts
             })
 
-            paid_at = (datetime.fromisoformat(created_ts) + timedelta(hours=random.randint(1, 48)))
+            paid_at = (created_dt + timedelta(hours=paid_hours[o]))
             stream_write(stream_files["payments"], {
                 "id": pay_id, "order_id": order_id,
-                "payment_method": random.choice(PAY_METHODS),
+                "payment_method": pay_methods[o],
                 "payment_status": "paid" if status != "CANCELLED" else "failed",
                 "paid_at": None if status == "CANCELLED" else paid_at.isoformat(timespec="seconds")
             })
             pay_id += 1
 
             if status in {"SHIPPED", "COMPLETED"}:
-                ship_ts = random_date_between(created_ts, "now")
+                ship_ts = random_date_between(created_ts, now)
                 stream_write(stream_files["shipments"], {
                     "id": ship_id, "order_id": order_id,
                     "tracking_number": faker.bothify("??########"),
                     "shipped_at": ship_ts,
-                    "delivered_at": random_date_between(ship_ts, "now"),
+                    "delivered_at": random_date_between(ship_ts, now),
                     "carrier": random.choice(CARRIERS)
                 })
                 ship_id += 1
 
             order_id += 1
+            o += 1
 
         # Einkaufswagen
-        for prod in random.sample(products, k=random.randint(0, 3)):
+        for prod_id in random.sample(prod_ids, k=num_carts[k]):
             stream_write(stream_files["cart_items"], {
-                "id": cart_id, "user_id": uid, "product_id": prod["id"],
+                "id": cart_id, "user_id": uid, "product_id": prod_id,
                 "quantity": random.randint(1, 2),
-                "added_at": random_date_this_year()
+                "added_at": random_date_this_year(now)
             })
             cart_id += 1
 
-        # Wunschlisten ohne Duplikate
-        max_wishes = random.randint(1, 5)
-        attempts, wishes = 0, 0
-        while wishes < max_wishes and attempts < 3 * max_wishes:
-            prod = random.choice(products)
-            key = (uid, prod["id"])
-            attempts += 1
-            if key in wishlist_pairs:
-                continue
-            wishlist_pairs.add(key)
-            wishes += 1
+        # Wunschlisten ohne Duplikate: random.sample zieht direkt verschiedene Produkte,
+        # ohne Ablehnungsschleife und Duplikat-Set
+        for prod_id in random.sample(prod_ids, k=num_wishes[k]):
             stream_write(stream_files["wishlists"], {
-                "user_id": uid, "product_id": prod["id"],
-                "created_at": random_date_this_year()
+                "user_id": uid, "product_id": prod_id,
+                "created_at": random_date_this_year(now)
             })
 
         # Zusätzliche Produktansichten simulieren
-        for _ in range(random.randint(1, 10)):
-            prod = random.choice(products)
+        for _ in range(num_views[k]):
+            prod_id = random.choice(prod_ids)
             stream_write(stream_files["product_views"], {
-                "id": view_id, "user_id": uid, "product_id": prod["id"],
-                "viewed_at": random_date_this_year()
+                "id": view_id, "user_id": uid, "product_id": prod_id,
+                "viewed_at": random_date_this_year(now)
             })
             view_id += 1
 
-    # Falls keine Bewertungen generiert wurden, Dummy-Eintrag erzeugen
-    reviews_path = out_dir / "reviews.jsonl"
-    if reviews_path.stat().st_size == 0:
+    close_stream_files(stream_files)
+    return {table: f.count for table, f in stream_files.items()}
+
+
+# Hauptfunktion zur Generierung eines vollständigen Nutzungsdatensatzes
+def build_dataset(num_users: int, data_dir: Path | str = "product_data", out_dir: Path | str = "output_streamed",
+                  final_dir: Path | str = "output", workers: int | None = None,
+                  seed: int | None = None) -> None:
+    # Vorbereitung der Verzeichnisse
+    data_dir  = Path(data_dir)
+    out_dir   = Path(out_dir)
+    final_dir = Path(final_dir)
+    out_dir.mkdir(exist_ok=True)
+
+    # Fester Seed → reproduzierbarer Datensatz (Faker-Pools, Blöcke und Dummy-Review)
+    if seed is not None:
+        random.seed(seed)
+        faker.seed_instance(seed)
+
+    # Lade Produktdaten aus CSV und berechne Bewertungs-Gewicht
+    df = pd.read_csv(
+        data_dir / "product_dataset.csv",
+        usecols=["title", "price", "categoryName", "reviews"],
+        encoding="utf-8",
+        converters={"reviews": lambda x: int(str(x).replace(",", "").strip()) if x else 0}
+    ).dropna()
+    max_reviews = df["reviews"].max()
+
+    # Produkte spaltenweise ablegen (Structure of Arrays): Position i steht für ein
+    # Produkt mit ID prod_ids[i], Preis prod_prices[i] und Review-Gewicht prod_weights[i]
+    n_products   = len(df)
+    prod_ids     = list(range(1, n_products + 1))
+    prod_prices  = df["price"].astype(float).tolist()
+    prod_weights = ((0.05 + 0.85 * (df["reviews"] / max_reviews)).tolist() if max_reviews
+                    else [0.05] * n_products)
+
+    # Referenzzeitpunkt einmal bestimmen statt datetime.now() bei jedem Zufallsdatum
+    now = datetime.now()
+
+    # Faker-Werte einmal vorab erzeugen und danach nur noch per random.choice ziehen –
+    # jeder Faker-Aufruf durchläuft Provider und Templates
+    pool_size   = min(num_users, FAKER_POOL_SIZE)
+    name_pool   = [faker.name() for _ in range(pool_size)]
+    email_pool  = [faker.email().split("@") for _ in range(pool_size)]
+    street_pool = [faker.street_address() for _ in range(pool_size)]
+    city_pool   = [faker.city() for _ in range(pool_size)]
+    zip_pool    = [faker.postcode() for _ in range(pool_size)]
+
+    # Nutzer in zusammenhängende Blöcke fester Größe (USER_BLOCK_SIZE) aufteilen. Jeder
+    # Block bekommt eine eigene, unabhängige SeedSequence abgeleitet aus dem Seed.
+    # Blockgrenzen und Seeds hängen nur von (seed, num_users) ab, nicht von der
+    # Prozessanzahl – --workers bestimmt nur, wie viele Blöcke parallel laufen, und
+    # derselbe Seed liefert auf jeder Maschine denselben Datensatz.
+    n_chunks = max(1, -(-num_users // USER_BLOCK_SIZE))
+    bounds = [1 + min(c * USER_BLOCK_SIZE, num_users) for c in range(n_chunks + 1)]
+    *seeds, extra_seed = np.random.SeedSequence(seed).spawn(n_chunks + 1)
+    n_workers = max(1, min(workers or os.cpu_count() or 1, n_chunks))
+    products = (prod_ids, prod_prices, prod_weights)
+    pools = (name_pool, email_pool, street_pool, city_pool, zip_pool)
+    chunk_dirs = [out_dir / f"part_{c:03d}" for c in range(n_chunks)]
+    tasks = [(bounds[c], bounds[c + 1], chunk_dirs[c], seeds[c]) for c in range(n_chunks)]
+
+    # Produktspalten und Pools gehen einmal je Prozess über den Initializer,
+    # die Aufgaben selbst enthalten nur Blockgrenzen, Zielordner und Seed
+    progress = dict(total=n_chunks, unit="Block", desc=f"Generiere {num_users} Nutzer")
+    if n_workers == 1:
+        init_worker(products, pools, now)
+        counts = [generate_user_chunk(task) for task in tqdm(tasks, **progress)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker,
+                                 initargs=(products, pools, now)) as pool:
+            counts = list(tqdm(pool.map(generate_user_chunk, tasks), **progress))
+
+    # Falls keine Bewertungen generiert wurden, Dummy-Eintrag erzeugen – mit eigenem
+    # Seed, da die Blöcke im Einzelprozess-Fall den globalen Zufallsstatus verändern
+    if sum(c["reviews"] for c in counts) == 0:
         print("⚠️ Keine Reviews generiert – erzeuge 1 Dummy-Review")
+        random.seed(int(extra_seed.generate_state(1, np.uint64)[0]))
         random_uid = random.randint(1, num_users)
-        random_prod = random.choice(products)
-        stream_write(stream_files["reviews"], {
-            "id": rev_id, "user_id": random_uid,
-            "product_id": random_prod["id"], "rating": random.randint(1, 5),
-            "comment": None, "created_at": random_date_this_year()
+        random_prod_id = random.choice(prod_ids)
+        extra_files = open_stream_files(out_dir / "part_extra", ["reviews"])
+        stream_write(extra_files["reviews"], {
+            "id": 1, "user_id": random_uid,
+            "product_id": random_prod_id, "rating": random.randint(1, 5),
+            "comment": None, "created_at": random_date_this_year(now)
         })
-
-    # Streams schließen und JSON-Dateien zusammenfügen
-    close_stream_files(stream_files)
+        close_stream_files(extra_files)
+        chunk_dirs.append(out_dir / "part_extra")
+        counts.append({"reviews": 1})
+
+    # Block-Offsets je Tabelle als laufende Summe der Zeilenanzahlen → lückenlose IDs
+    offsets, running = [], dict.fromkeys(ID_FIELDS, 0)
+    for c in counts:
+        offsets.append(dict(running))
+        for table in running:
+            running[table] += c.get(table, 0)
+
+    # JSON-Dateien zusammenfügen
     print(f"\n✓ Streaming-Datensatz gespeichert unter: {out_dir.resolve()}")
     print(f"Dateien Zusammensetzen...")
-    merge_jsonl_to_single_file(out_dir, final_dir, num_users)
-
+    merge_stream_files_to_single_file(out_dir, chunk_dirs, offsets, final_dir, num_users)
 
-# Funktion zum Einrücken/Schönformatieren einer JSON-Datei
-def beautify_json_file(file_path: Path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
 
+# Verschiebt die IDs einer Teildatei um die Block-Offsets und kodiert sie neu
+def shift_part_ids(data: bytes, shift: dict[str, int]) -> bytes:
+    rows = orjson.loads(b"[" + data + b"]")
+    for row in rows:
+        for field, delta in shift.items():
+            row[field] += delta
+    return b",\n".join(map(orjson.dumps, rows))
 
-# Funktion zum Zusammenführen mehrerer .jsonl-Dateien in eine strukturierte JSON-Datei
-def merge_jsonl_to_single_file(stream_dir: Path, final_dir: Path, num_users: int):
-    tables = [
-        "users", "addresses",
-        "orders", "order_items", "payments", "shipments",
-        "reviews", "cart_items", "wishlists",
-        "product_views", "product_purchases"
-    ]
 
+# Funktion zum Zusammenführen der Teildateien aller Blöcke in eine strukturierte JSON-Datei
+def merge_stream_files_to_single_file(stream_dir: Path, chunk_dirs: list[Path], offsets: list[dict[str, int]],
+                                      final_dir: Path, num_users: int):
     final_dir.mkdir(parents=True, exist_ok=True)
     final_file = final_dir / f"users_{num_users}.json"
 
-    # Zusammenführen aller Tabellen aus .jsonl-Dateien in ein großes JSON-Objekt
-    with open(final_file, "w", encoding="utf-8") as out:
-        out.write("{\n")
-        for i, table in enumerate(tables):
-            out.write(f'"{table}": [\n')
+    # Die Teildateien enthalten fertige JSON-Array-Einträge → blockweise aneinanderhängen.
+    # Nur Teile mit Offset ungleich 0 werden geparst, um die IDs lückenlos fortzuzählen;
+    # der Rest (z. B. der erste Block) wird unverändert kopiert.
+    with open(final_file, "wb") as out:
+        out.write(b"{\n")
+        for i, table in enumerate(TABLES):
+            out.write(f'"{table}": ['.encode("utf-8"))
             first = True
-            with open(stream_dir / f"{table}.jsonl", "r", encoding="utf-8") as f:
-                for line in f:
-                    if not first:
-                        out.write(",\n")
-                    out.write(line.strip())
-                    first = False
-            out.write("\n]")
-            if i < len(tables) - 1:
-                out.write(",\n")
-        out.write("\n}\n")
+            for chunk_dir, chunk_offsets in zip(chunk_dirs, offsets):
+                part = chunk_dir / f"{table}.json"
+                if not part.exists() or part.stat().st_size == 0:
+                    continue
+                if not first:
+                    out.write(b",\n")
+                shift = {field: chunk_offsets[src] for field, src in ID_FIELDS.get(table, {}).items()
+                         if chunk_offsets[src]}
+                if shift:
+                    out.write(shift_part_ids(part.read_bytes(), shift))
+                else:
+                    with open(part, "rb") as f:
+                        shutil.copyfileobj(f, out, 1 << 20)
+                first = False
+            out.write(b"]")
+            if i < len(TABLES) - 1:
+                out.write(b",\n")
+        out.write(b"\n}\n")
 
     print(f"\n✓ Zusammengeführte Datei gespeichert unter: {final_file.resolve()}")
 
@@ -293,9 +427,6 @@ def merge_jsonl_to_single_file(stream_dir: Path, final_dir: Path, num_users: int
         print(f"✓ Stream-Ordner gelöscht: {stream_dir}")
     except Exception as e:
         print(f"⚠ Fehler beim Löschen von {stream_dir}: {e}")
-    
-    # Formatierung verbessern
-    beautify_json_file(final_file)
 
 
 # CLI-Interface zur Nutzung via Kommandozeile
@@ -305,6 +436,11 @@ if __name__ == "__main__":
     ap.add_argument("--data", default="product_data", help="Ordner mit product_dataset.csv")
     ap.add_argument("--out", default="output_streamed", help="Ordner für Stream-Dateien")
     ap.add_argument("--final", default="output", help="Zielordner für die finale JSON-Datei")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Anzahl paralleler Prozesse für die Nutzergenerierung (Standard: CPU-Kerne); "
+                         "ändert nur die Laufzeit, nicht die erzeugten Daten")
+    ap.add_argument("--seed", type=int, default=None,
+                    help="Seed für einen reproduzierbaren Datensatz (Standard: zufällig)")
     args = ap.parse_args()
 
-    build_dataset(args.users, Path(args.data), Path(args.out), Path(args.final))
+    build_dataset(args.users, Path(args.data), Path(args.out), Path(args.final), args.workers, args.seed)
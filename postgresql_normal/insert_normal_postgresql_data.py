@@ -6,7 +6,7 @@ import psycopg2
 from pathlib import Path
 from tqdm import tqdm
 from typing import List
-import csv, math, subprocess
+import csv, io, math, subprocess
 from pathlib import Path
 
 BATCH_SIZE = 500_000
@@ -49,6 +49,41 @@ def fix_sequences(conn):
     print("✅ Alle Sequences wurden angepasst.")
 
 
+def read_sql_file(path: Path) -> str:
+    # Liest ein SQL-Skript ein; *.zst-Dateien (export_sql_cypher.py --zstd) werden
+    # beim Lesen entpackt.
+    if path.suffix == ".zst":
+        import zstandard                                # nur für .zst-Dateien benötigt
+        with open(path, "rb") as f:
+            reader = zstandard.ZstdDecompressor().stream_reader(f)
+            return io.TextIOWrapper(reader, encoding="utf-8").read()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def execute_sql_script(cur, script: str):
+    # Führt ein SQL-Skript aus, das neben normalen Befehlen auch COPY … FROM STDIN-Blöcke
+    # (Daten bis zur Zeile "\.") enthalten darf. Normale Befehle gehen gesammelt an
+    # execute, jeder COPY-Block als Datenstrom an copy_expert.
+    statements, lines = [], iter(script.splitlines(keepends=True))
+    for line in lines:
+        if line.startswith("COPY ") and line.rstrip().endswith("FROM STDIN;"):
+            if statements:
+                cur.execute("".join(statements))
+                statements.clear()
+            data = io.StringIO()
+            for row in lines:
+                if row.rstrip("\r\n") == "\\.":
+                    break
+                data.write(row)
+            data.seek(0)
+            cur.copy_expert(line.strip(), data)
+        else:
+            statements.append(line)
+    if "".join(statements).strip():
+        cur.execute("".join(statements))
+
+
 def insert_dynamic_with_executemany(cur, conn, table: str, rows: List[dict]):
     # Prüft, ob überhaupt Daten übergeben wurden. Falls nicht, wird die Funktion beendet.
     if not rows:
@@ -105,12 +140,13 @@ def insert_data_to_normal_postgres(file_id: int, json_dir: str = "../output"):
 
     # Prüft, ob eine SQL-Datei mit statischen Daten existiert und führt sie ggf. aus
     static_sql_path = Path(__file__).parent / "static_products_data.sql"
+    zst_sql_path = static_sql_path.with_name(static_sql_path.name + ".zst")
+    if not static_sql_path.exists() and zst_sql_path.exists():
+        static_sql_path = zst_sql_path                  # export_sql_cypher.py --zstd
     if static_sql_path.exists():
         print(f"\n📄 Füge statische Produktdaten aus '{static_sql_path.name}' ein ...")
         try:
-            with open(static_sql_path, "r", encoding="utf-8") as f:
-                static_sql = f.read()
-            cur.execute(static_sql)
+            execute_sql_script(cur, read_sql_file(static_sql_path))
             conn.commit()
             print("✅ Statische Daten erfolgreich eingefügt.")
         except Exception as e:
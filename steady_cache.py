@@ -0,0 +1,110 @@
+# steady_cache.py
+#
+# Gemeinsamer Lese- und Schreibpfad für die Ergebnis-CSVs: compute_stats.py und
+# compute_significance.py lesen die Steady-Zeilen über denselben Parquet-Cache,
+# analyse.py nutzt dieselbe Datei-Signatur für seinen Summen-Cache; Ergebnistabellen
+# schreiben analyse.py und compute_significance.py über write_csv.
+
+import hashlib
+import re
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ─── Einstellungen ─────────────────────────────────────────────────────────
+RES_DIR        = Path("results")
+# Metriken im gemeinsamen Steady-Cache (Schema des _steady_<sig>.parquet)
+STEADY_METRICS = ["duration_ms", "avg_cpu", "avg_mem"]
+COMPLEXITY_ORDER = ["easy", "medium", "complex", "very_complex", "create", "update", "delete"]
+
+# ─── Complexity-Mapping ────────────────────────────────────────────────────
+# obere Query-ID je Gruppe: 1–3 easy, 4–6 medium, … , ab 21 delete
+COMPLEXITY_BINS = [0, 3, 6, 9, 12, 16, 20, float("inf")]
+
+# ─── Cache-Schlüssel ───────────────────────────────────────────────────────
+def file_signature(files: list[Path]) -> str:
+    """
+    Kurzer Schlüssel über die Menge der CSVs (Name, Änderungszeit, Größe) –
+    auch hinzugefügte oder gelöschte Dateien ergeben einen neuen Schlüssel.
+    """
+    return hashlib.sha1(repr(sorted(
+        (f.name, f.stat().st_mtime_ns, f.stat().st_size) for f in files
+    )).encode()).hexdigest()[:16]
+
+# ─── CSVs laden und Grunddaten aufbereiten ────────────────────────────────
+def scan_steady(files: list[Path]) -> pa.Table:
+    """
+    Liest alle CSVs in einem PyArrow-Dataset-Scan; Steady-Filter und
+    Spaltenauswahl greifen schon beim Parsen, Warmup-Zeilen kommen nie in pandas.
+    """
+    users_of = {f.name: int(re.match(r"(\d+)_", f.name).group(1)) for f in files}
+    dataset  = ds.dataset(
+        [str(f) for f in files],
+        format=ds.CsvFileFormat(convert_options=pacsv.ConvertOptions(
+            column_types={"concurrency": pa.int16(), "query_no": pa.int16(),
+                          **{m: pa.float64() for m in STEADY_METRICS}})),
+    )
+    # variant = db + "_" + mode entsteht schon im Scan (Arrow statt Python-Strings)
+    scanner  = dataset.scanner(
+        columns={
+            "variant":     pc.binary_join_element_wise(ds.field("db"), ds.field("mode"), "_"),
+            "concurrency": ds.field("concurrency"),
+            "query_no":    ds.field("query_no"),
+            **{m: ds.field(m) for m in STEADY_METRICS},
+        },
+        filter=ds.field("phase") == "steady",
+    )
+    # users je Datei als zusätzliche Spalte an jeden Block hängen
+    batches = []
+    for tagged in scanner.scan_batches():
+        batch = tagged.record_batch
+        users = users_of[Path(tagged.fragment.path).name]
+        batches.append(batch.append_column("users", pa.array([users] * batch.num_rows, pa.int32())))
+    tbl = pa.Table.from_batches(batches)
+    # variant als Dictionary → in pandas direkt Categorical (Int-Codes statt Objekte)
+    return tbl.set_column(0, "variant", tbl["variant"].dictionary_encode())
+
+def load_steady(files: list[Path], columns: list, row_filter=None) -> pd.DataFrame:
+    """
+    Steady-Zeilen aller CSVs über den gemeinsamen Parquet-Cache: solange sich
+    die Menge der CSVs nicht ändert, liest jedes Skript nur noch die benötigten
+    Spalten aus dem Cache statt alle CSVs zu parsen.
+    """
+    cache = RES_DIR / f"_steady_{file_signature(files)}.parquet"
+    if not cache.exists():
+        tbl = scan_steady(files)
+        for old in RES_DIR.glob("_steady_*.parquet"):   # veraltete Caches entfernen
+            old.unlink()
+        pq.write_table(tbl, cache, compression="zstd")
+
+    df = ds.dataset(cache).to_table(columns=columns, filter=row_filter).to_pandas()
+    df["variant"] = df["variant"].cat.reorder_categories(
+        sorted(df["variant"].cat.categories))      # alphabetisch wie bisher
+    df["complexity"] = pd.cut(df["query_no"], bins=COMPLEXITY_BINS,
+                              labels=COMPLEXITY_ORDER, ordered=True)
+    return df
+
+# ─── Ergebnistabellen schreiben ────────────────────────────────────────────
+def write_csv(table: pd.DataFrame, path: Path) -> None:
+    """
+    Schreibt eine Ergebnistabelle über PyArrows C++-CSV-Writer.
+    Nicht-numerische Spalten (z. B. users mit Zeile 'ALL', complexity, variant,
+    significant) werden als Text geschrieben. Wie bei to_csv ohne
+    Anführungszeichen und mit True/False – keiner der Werte enthält Komma oder Quote.
+    """
+    text_cols = table.select_dtypes(exclude="number").columns
+    arrow_tbl = pa.Table.from_pandas(
+        table.astype({c: str for c in text_cols}), preserve_index=False
+    )
+    with open(path, "wb") as fh:
+        fh.write((",".join(table.columns) + "\n").encode())
+        pacsv.write_csv(
+            arrow_tbl, fh,
+            write_options=pacsv.WriteOptions(include_header=False,
+                                             quoting_style="none"),
+        )
@@ -0,0 +1,56 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import generate_data
+
+
+# Fester Referenzzeitpunkt, damit beide Läufe dieselben Zeitstempel ziehen
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 6, 15, 12, 0, 0)
+
+
+def write_product_csv(data_dir: Path) -> None:
+    data_dir.mkdir()
+    rows = ["title,price,categoryName,reviews"]
+    rows += [f"Produkt {i},{5 + i * 1.5:.2f},Kategorie {i % 7},{i * 13 % 500}" for i in range(1, 201)]
+    (data_dir / "product_dataset.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+
+def generate(tmp_path: Path, name: str, workers: int) -> bytes:
+    run_dir = tmp_path / name
+    run_dir.mkdir()
+    generate_data.build_dataset(2_500, tmp_path / "data", run_dir / "stream", run_dir / "final",
+                                workers=workers, seed=42)
+    return (run_dir / "final" / "users_2500.json").read_bytes()
+
+
+# Gleicher Seed → byte-identischer Datensatz, unabhängig von der Prozessanzahl
+def test_seed_is_reproducible_across_worker_counts(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_data, "datetime", FixedDatetime)
+    write_product_csv(tmp_path / "data")
+
+    single = generate(tmp_path, "workers_1", workers=1)
+    parallel = generate(tmp_path, "workers_3", workers=3)
+
+    assert single == parallel
+
+
+# IDs jeder Tabelle laufen über alle Blöcke lückenlos von 1 bis Zeilenanzahl
+def test_ids_are_contiguous_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(generate_data, "datetime", FixedDatetime)
+    write_product_csv(tmp_path / "data")
+
+    data = orjson.loads(generate(tmp_path, "dense", workers=1))
+
+    for table, rows in data.items():
+        if rows and "id" in rows[0]:
+            assert sorted(r["id"] for r in rows) == list(range(1, len(rows) + 1)), table
+    order_ids = {r["id"] for r in data["orders"]}
+    for table in ("order_items", "payments", "shipments"):
+        assert all(r["order_id"] in order_ids for r in data[table]), table